@@ -1,5 +1,27 @@
 import csv
 import math
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+# Regulation eras covered by the data set, as inclusive (first season, last season) ranges.
+# Era leaderboards only filter membership: they rank everyone who raced in the era by their
+# career rating, not by a rating computed from that era's races alone.
+ERAS = {
+    'V8': (2010, 2013),
+    'Turbo-hybrid': (2014, 2020)
+}
+
+
+# Ratings are stored internally as exact integer counts of 1/ELO_SCALE of an ELO point, which
+# represents every weighted race score (including half points) without rounding.
+ELO_SCALE = 20
+
+# How ratings are rounded, chosen per F1Graph:
+#   - 'exact': per-race scores are kept exactly and every ELO is rounded up to the nearest
+#     integer only when it is read.
+#   - 'compat': each per-race score is also rounded up as it is recorded, reproducing the
+#     ratings of earlier versions of this project.
+ROUNDING_MODES = ('exact', 'compat')
 
 
 class Driver:
@@ -10,26 +32,40 @@ class Driver:
         - driver_name (str): the driver's name
         - constructor_to_elo (dict): maps constructor names to the ELO calculated for that race/season
         - final_elo (float): the driver's overall ELO, computed as the average of the ELOs across all constructors they've raced for
+        - seasons (set): the years the driver raced in
+
+    constructor_to_elo and final_elo are read-only views, rounded up from exact integer
+    ELO_SCALE units; change ratings with add_elo_units and set_elo_units, which update them in O(1).
 
     Representation Invariants:
         - driver_name != ''
         - all keys in constructor_to_elo are valid constructor names
+        - self._elo_units.keys() == self.constructor_to_elo.keys()
+        - self._units_sum == sum(self._elo_units.values())
     """
     driver_name: str
     constructor_to_elo: dict[str, float]
     final_elo: float
+    seasons: set[int]
+    _elo_units: dict[str, int]
+    _units_sum: int
 
     def __init__(self, driver_name: str) -> None:
         """Initialize a new Driver with the given name."""
         self.driver_name = driver_name
         self.constructor_to_elo = {}
         self.final_elo = 0.0
+        self.seasons = set()
+        self._elo_units = {}
+        self._units_sum = 0
 
     def calculate_driver_elo(self, f1_graph: "F1Graph", pole_points: float | int, qual_points: float | int,
-                             teammate_position: float | int, name: str) -> None:
+                             teammate_position: float | int, name: str, year: int | None = None) -> None:
         """
         Calculate and update the driver's ELO for a given race for a specific constructor.
         The ELO for the race is computed as a weighted sum of pole_points, qual_points, and teammate_position.
+        If year is given, it is recorded as a season for both the driver and the constructor, so
+        the per-era leaderboards include them; without it, their era membership is unchanged.
 
         Preconditions:
          - f1_graph is an instance of F1Graph
@@ -51,28 +87,52 @@ class Driver:
         weighting_for_qual_points = 0.3
         weighting_for_teammate_position = 0.1
 
-        elo_rating = math.ceil((weighting_for_pole_points * pole_points) +
-                               (weighting_for_qual_points * qual_points) +
-                               (weighting_for_teammate_position * teammate_position))
-
-        if name in self.constructor_to_elo:
-            self.constructor_to_elo[name] += elo_rating
+        weighted_score = ((weighting_for_pole_points * pole_points) +
+                          (weighting_for_qual_points * qual_points) +
+                          (weighting_for_teammate_position * teammate_position))
+        if f1_graph.rounding == 'compat':
+            elo_units = math.ceil(weighted_score) * ELO_SCALE
         else:
-            self.constructor_to_elo[name] = elo_rating
+            elo_units = round(weighted_score * ELO_SCALE)
+
+        if year is not None:
+            self.seasons.add(year)
+            constructor.seasons.add(year)
 
-        constructor.all_driver_elo[self] = self.constructor_to_elo[name]
-        constructor.calculate_elo()
+        self.add_elo_units(name, elo_units)
+        constructor.set_elo_units(self, self._elo_units[name])
+        f1_graph.update_rankings(drivers=[self], constructors=[constructor])
+
+    def elo_units(self, constructor_name: str) -> int | None:
+        """Return the driver's exact ELO for constructor_name in ELO_SCALE units, or None if there is none."""
+        return self._elo_units.get(constructor_name)
+
+    def add_elo_units(self, constructor_name: str, units: int) -> None:
+        """Add units (in ELO_SCALE units) to the driver's ELO for constructor_name."""
+        self.set_elo_units(constructor_name, self._elo_units.get(constructor_name, 0) + units)
+
+    def set_elo_units(self, constructor_name: str, units: int | None) -> None:
+        """
+        Set the driver's ELO for constructor_name to units (in ELO_SCALE units), or remove it
+        if units is None. The constructor_to_elo and final_elo views are updated in O(1).
+        """
+        self._units_sum -= self._elo_units.pop(constructor_name, 0)
+        self.constructor_to_elo.pop(constructor_name, None)
+        if units is not None:
+            self._elo_units[constructor_name] = units
+            self._units_sum += units
+            self.constructor_to_elo[constructor_name] = _ceil_div(units, ELO_SCALE)
+        self.calculate_final_elo()
 
     def calculate_final_elo(self) -> float:
         """
         Compute the driver's overall final ELO as the average of the ELOs from all constructors.
         The result is rounded up to the nearest integer.
         """
-        if len(self.constructor_to_elo) == 0:
+        if len(self._elo_units) == 0:
             self.final_elo = 0.0
         else:
-            avg = sum(self.constructor_to_elo.values()) / len(self.constructor_to_elo)
-            self.final_elo = math.ceil(avg)
+            self.final_elo = _ceil_div(self._units_sum, len(self._elo_units) * ELO_SCALE)
         return self.final_elo
 
     def __hash__(self):
@@ -92,32 +152,60 @@ class Constructor:
         - constructor_name (str): the constructor's name
         - all_driver_elo (dict): maps Driver objects to their ELO values for this constructor
         - constructor_elo (float): the overall ELO of the constructor (average of driver ELOs)
+        - seasons (set): the years the constructor raced in
+
+    all_driver_elo and constructor_elo are read-only views, rounded up from exact integer
+    ELO_SCALE units; change ratings with set_elo_units, which updates them in O(1).
 
     Representation Invariants:
         - constructor_name != ''
         - constructor_elo >= 0.0
+        - self._elo_units.keys() == self.all_driver_elo.keys()
+        - self._units_sum == sum(self._elo_units.values())
     """
     constructor_name: str
     all_driver_elo: dict[Driver, float]
     constructor_elo: float
+    seasons: set[int]
+    _elo_units: dict[Driver, int]
+    _units_sum: int
 
     def __init__(self, constructor_name: str) -> None:
         """Initialize a new Constructor with the given name."""
         self.constructor_name = constructor_name
         self.all_driver_elo = {}
         self.constructor_elo = 0.0
+        self.seasons = set()
+        self._elo_units = {}
+        self._units_sum = 0
+
+    def elo_units(self, driver: Driver) -> int | None:
+        """Return driver's exact ELO for this constructor in ELO_SCALE units, or None if there is none."""
+        return self._elo_units.get(driver)
+
+    def set_elo_units(self, driver: Driver, units: int | None) -> None:
+        """
+        Set driver's ELO for this constructor to units (in ELO_SCALE units), or remove it if
+        units is None. The all_driver_elo and constructor_elo views are updated in O(1).
+        """
+        self._units_sum -= self._elo_units.pop(driver, 0)
+        self.all_driver_elo.pop(driver, None)
+        if units is not None:
+            self._elo_units[driver] = units
+            self._units_sum += units
+            self.all_driver_elo[driver] = _ceil_div(units, ELO_SCALE)
+        self.calculate_elo()
 
     def calculate_elo(self) -> float:
         """
         Calculate the constructor's overall ELO as the average of all driver ELOs.
         Returns the average, rounded up to the nearest integer.
         """
-        total_elo = sum(self.all_driver_elo.values())
-        count = len(self.all_driver_elo)
+        count = len(self._elo_units)
         if count == 0:
             self.constructor_elo = 0.0
         else:
-            self.constructor_elo = math.ceil(total_elo / count)
+            self.constructor_elo = _ceil_div(self._units_sum, count * ELO_SCALE)
         return self.constructor_elo
 
     def __hash__(self):
@@ -129,6 +217,93 @@ class Constructor:
         return isinstance(other, Constructor) and self.constructor_name == other.constructor_name
 
 
+class Leaderboard:
+    """
+    An order-statistics index of ratings, kept sorted from highest to lowest rating
+    (ties broken by name) so rankings never require sorting the whole population.
+
+    Lookups (rank_of, percentile, rating_of) binary-search the index in O(log n) and top(k)
+    is O(k). An update locates its position in O(log n); the list insertion itself is a
+    memory move, which for the few hundred drivers and constructors here is cheaper than
+    any balanced tree.
+
+    Instance Attributes:
+        - ratings (dict): maps each name in the index to its rating
+
+    Representation Invariants:
+        - len(self._entries) == len(self._keys) == len(self.ratings)
+        - self._entries == sorted((-rating, name) for name, rating in self.ratings.items())
+        - self._keys == [key for key, _ in self._entries]
+    """
+    ratings: dict[str, float]
+    _entries: list[tuple[float, str]]
+    _keys: list[float]
+
+    def __init__(self) -> None:
+        """Initialize an empty Leaderboard."""
+        self.ratings = {}
+        self._entries = []
+        self._keys = []
+
+    def update(self, name: str, rating: float) -> None:
+        """Insert name with the given rating, or move it if it is already in the index."""
+        if self.ratings.get(name) == rating:
+            return
+        self.remove(name)
+        entry = (-rating, name)
+        index = bisect_left(self._entries, entry)
+        self._entries.insert(index, entry)
+        self._keys.insert(index, -rating)
+        self.ratings[name] = rating
+
+    def remove(self, name: str) -> None:
+        """Remove name from the index, if present."""
+        if name not in self.ratings:
+            return
+        index = bisect_left(self._entries, (-self.ratings.pop(name), name))
+        del self._entries[index]
+        del self._keys[index]
+
+    def rank_of(self, name: str) -> int:
+        """
+        Return the 1-based rank of name; tied ratings share the best rank.
+
+        Preconditions:
+         - name in self
+        """
+        return bisect_left(self._keys, -self.ratings[name]) + 1
+
+    def percentile(self, name: str) -> float:
+        """
+        Return the percentile rank of name: the percentage of the index rated below it,
+        counting ties as half.
+
+        Preconditions:
+         - name in self
+        """
+        key = -self.ratings[name]
+        above = bisect_left(self._keys, key)
+        tied = bisect_right(self._keys, key) - above
+        below = len(self._keys) - above - tied
+        return 100 * (below + tied / 2) / len(self._keys)
+
+    def top(self, k: int) -> list[tuple[str, float]]:
+        """Return the k highest rated (name, rating) pairs, best first."""
+        return [(name, -key) for key, name in self._entries[:k]]
+
+    def rating_of(self, name: str) -> float:
+        """Return the rating stored for name."""
+        return self.ratings[name]
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether name is in the index."""
+        return name in self.ratings
+
+    def __len__(self) -> int:
+        """Return the number of names in the index."""
+        return len(self.ratings)
+
+
 class F1Graph:
     """
     A graph representing F1 drivers and constructors and their ELO ratings.
@@ -137,15 +312,43 @@ class F1Graph:
         - database (set): a set of all Constructor objects in the graph.
         - drivers (dict): a mapping from driver names to Driver objects.
         - edges (set): a set of tuples (Driver, Constructor) representing connections.
+        - driver_ranks (dict): maps None (overall) and each era name in ERAS to a
+          Leaderboard of the career final ELOs of the drivers who raced in that era
+        - constructor_ranks (dict): maps None (overall) and each era name in ERAS to a
+          Leaderboard of the career ELOs of the constructors who raced in that era
+        - rounding (str): how ratings are rounded; one of ROUNDING_MODES
+
+    Representation Invariants:
+        - self.rounding in ROUNDING_MODES
     """
     database: set[Constructor]
     drivers: dict[str, Driver]
     edges: set[tuple[Driver, Constructor]]
-
-    def __init__(self) -> None:
+    driver_ranks: dict[str | None, Leaderboard]
+    constructor_ranks: dict[str | None, Leaderboard]
+    rounding: str
+
+    def __init__(self, rounding: str = 'exact') -> None:
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"Unknown rounding mode: {rounding}")
+        self.rounding = rounding
         self.database = set()
         self.drivers = {}
         self.edges = set()
+        self.driver_ranks = {era: Leaderboard() for era in [None, *ERAS]}
+        self.constructor_ranks = {era: Leaderboard() for era in [None, *ERAS]}
+
+    def update_rankings(self, drivers: Iterable[Driver] = (), constructors: Iterable[Constructor] = ()) -> None:
+        """
+        Bring the overall and per-era leaderboards up to date with the current ELOs of the
+        given drivers and constructors. Call this whenever their ratings change.
+        """
+        for driver in drivers:
+            for era in _eras_of(driver.seasons):
+                self.driver_ranks[era].update(driver.driver_name, driver.final_elo)
+        for constructor in constructors:
+            for era in _eras_of(constructor.seasons):
+                self.constructor_ranks[era].update(constructor.constructor_name, constructor.constructor_elo)
 
     def add_constructor(self, constructor: Constructor) -> None:
         """Add a constructor to the graph's database."""
@@ -160,16 +363,17 @@ class F1Graph:
         self.edges.add((driver, constructor))
 
 
-def load_f1_graph(file_path: str) -> F1Graph:
+def load_f1_graph(file_path: str, rounding: str = 'exact') -> F1Graph:
     """
     Load the F1 data from the given CSV file, update driver and constructor ELOs,
-    and return an F1Graph object containing the data.
+    and return an F1Graph object containing the data. Ratings are rounded according to
+    rounding, which is one of ROUNDING_MODES.
 
     The CSV file is expected to have columns:
     raceId, year, driverId, constructorId, finish_points, grid, position,
     racer_name, constructor_name, qual_points, teammate_points
     """
-    f1_graph = F1Graph()
+    f1_graph = F1Graph(rounding)
 
     with open(file_path) as file:
         reader = csv.DictReader(file)
@@ -181,6 +385,7 @@ def load_f1_graph(file_path: str) -> F1Graph:
             qual_points = int(row['qual_points'])
             teammate_points_str = row['teammate_points']
             teammate_points = float(teammate_points_str) if teammate_points_str else 0.0
+            year = int(row['year'])
 
             constructor = None
             for constr in f1_graph.database:
@@ -202,18 +407,24 @@ def load_f1_graph(file_path: str) -> F1Graph:
             if driver is None:
                 driver = Driver(racer_name)
                 f1_graph.add_driver(driver)
-                constructor.all_driver_elo[driver] = 0.0
+                constructor.set_elo_units(driver, 0)
 
             driver.calculate_driver_elo(f1_graph,
                                         pole_points=finish_points,
                                         qual_points=qual_points,
                                         teammate_position=teammate_points,
-                                        name=constructor_name)
-            constructor.all_driver_elo[driver] = driver.constructor_to_elo[constructor_name]
-            constructor.calculate_elo()
+                                        name=constructor_name,
+                                        year=year)
             f1_graph.add_edge(driver, constructor)
 
-    for driver in f1_graph.drivers.values():
-        driver.calculate_final_elo()
-
     return f1_graph
+
+
+def _ceil_div(numerator: int, denominator: int) -> int:
+    """Return numerator / denominator rounded up to the nearest integer, using exact integer arithmetic."""
+    return -(-numerator // denominator)
+
+
+def _eras_of(seasons: set[int]) -> list[str | None]:
+    """Return None (overall) followed by the names of the eras in ERAS that overlap seasons."""
+    return [None] + [era for era, (first, last) in ERAS.items() if any(first <= year <= last for year in seasons)]
@@ -0,0 +1,234 @@
+import json
+import os
+from itertools import islice
+from typing import Any, Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+from entities import ROUNDING_MODES, F1Graph, load_f1_graph
+from journal import Journal
+from scenario_store import ScenarioStore, graph_version
+
+# Number of records written per Parquet/Arrow record batch.
+CHUNK_SIZE = 10000
+
+# Formats written by export_scenario.
+FORMATS = ('ndjson', 'graphml', 'parquet', 'arrow')
+
+# GraphML attribute keys: (id, applies to, name, type)
+GRAPHML_KEYS = [
+    ('label', 'node', 'label', 'string'),
+    ('group', 'node', 'group', 'string'),
+    ('elo', 'node', 'elo', 'double'),
+    ('rank', 'node', 'rank', 'int'),
+    ('edge_elo', 'edge', 'elo', 'double'),
+    ('hypothetical', 'edge', 'hypothetical', 'boolean')
+]
+
+
+def iter_nodes(f1_graph: F1Graph) -> Iterator[dict[str, Any]]:
+    """
+    Yield a record for every driver and constructor in f1_graph, with keys 'id', 'label',
+    'group' ('driver' or 'constructor'), 'elo' and 'rank' (overall rank, or None if unranked).
+    """
+    driver_ranks = f1_graph.driver_ranks[None]
+    for driver in f1_graph.drivers.values():
+        yield {
+            'id': f"driver-{driver.driver_name}",
+            'label': driver.driver_name,
+            'group': 'driver',
+            'elo': float(driver.final_elo),
+            'rank': driver_ranks.rank_of(driver.driver_name) if driver.driver_name in driver_ranks else None
+        }
+
+    constructor_ranks = f1_graph.constructor_ranks[None]
+    for constructor in f1_graph.database:
+        name = constructor.constructor_name
+        yield {
+            'id': f"constructor-{name}",
+            'label': name,
+            'group': 'constructor',
+            'elo': float(constructor.constructor_elo),
+            'rank': constructor_ranks.rank_of(name) if name in constructor_ranks else None
+        }
+
+
+def iter_edges(f1_graph: F1Graph, journal: Journal | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Yield a record for every edge in f1_graph, with keys 'source', 'target', 'elo' (the
+    driver's ELO for that constructor) and 'hypothetical' (whether a delta in journal added
+    the edge; always False if journal is None).
+    """
+    hypothetical = set() if journal is None else {edge for _, delta in journal.applied for edge in delta.new_edges}
+    for driver, constructor in f1_graph.edges:
+        elo = driver.constructor_to_elo.get(constructor.constructor_name)
+        yield {
+            'source': f"driver-{driver.driver_name}",
+            'target': f"constructor-{constructor.constructor_name}",
+            'elo': None if elo is None else float(elo),
+            'hypothetical': (driver, constructor) in hypothetical
+        }
+
+
+def iter_constructor_elos(f1_graph: F1Graph) -> Iterator[dict[str, Any]]:
+    """Yield a record for every driver ELO held by each constructor, with keys 'constructor', 'driver' and 'elo'."""
+    for constructor in f1_graph.database:
+        for driver, elo in constructor.all_driver_elo.items():
+            yield {'constructor': constructor.constructor_name, 'driver': driver.driver_name, 'elo': float(elo)}
+
+
+def write_ndjson(f1_graph: F1Graph, file_path: str, journal: Journal | None = None) -> None:
+    """
+    Write f1_graph to file_path as newline-delimited JSON, one record per line. Each record
+    has a 'type' key of 'node', 'edge' or 'constructor_elo' and the keys yielded by iter_nodes,
+    iter_edges or iter_constructor_elos respectively. Hypothetical edges are marked using journal.
+    """
+    records = [('node', iter_nodes(f1_graph)), ('edge', iter_edges(f1_graph, journal)),
+               ('constructor_elo', iter_constructor_elos(f1_graph))]
+    with open(file_path, 'w', encoding='utf-8') as file:
+        for record_type, rows in records:
+            for row in rows:
+                file.write(json.dumps({'type': record_type, **row}, separators=(',', ':')))
+                file.write('\n')
+
+
+def write_graphml(f1_graph: F1Graph, file_path: str, journal: Journal | None = None) -> None:
+    """
+    Write f1_graph to file_path as an undirected GraphML graph, with each node's label,
+    group, ELO and rank and each edge's ELO and hypothetical flag as attributes.
+    Hypothetical edges are marked using journal.
+    """
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for key_id, domain, name, key_type in GRAPHML_KEYS:
+            file.write(f'  <key id="{key_id}" for="{domain}" attr.name="{name}" attr.type="{key_type}"/>\n')
+        file.write('  <graph id="F1Graph" edgedefault="undirected">\n')
+
+        for node in iter_nodes(f1_graph):
+            file.write(f'    <node id={quoteattr(node["id"])}>')
+            file.write(_graphml_data('label', node['label']))
+            file.write(_graphml_data('group', node['group']))
+            file.write(_graphml_data('elo', node['elo']))
+            file.write(_graphml_data('rank', node['rank']))
+            file.write('</node>\n')
+
+        for edge in iter_edges(f1_graph, journal):
+            file.write(f'    <edge source={quoteattr(edge["source"])} target={quoteattr(edge["target"])}>')
+            file.write(_graphml_data('edge_elo', edge['elo']))
+            file.write(_graphml_data('hypothetical', 'true' if edge['hypothetical'] else 'false'))
+            file.write('</edge>\n')
+
+        file.write('  </graph>\n</graphml>\n')
+
+
+def write_parquet(f1_graph: F1Graph, directory: str, journal: Journal | None = None,
+                  chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write f1_graph to nodes.parquet, edges.parquet and constructor_elos.parquet in directory,
+    chunk_size records per row group. Hypothetical edges are marked using journal.
+    Requires pyarrow.
+    """
+    import pyarrow.parquet as pq
+
+    for name, schema, rows in _arrow_tables(f1_graph, journal):
+        with pq.ParquetWriter(os.path.join(directory, f"{name}.parquet"), schema) as writer:
+            for batch in _record_batches(rows, schema, chunk_size):
+                writer.write_batch(batch)
+
+
+def write_arrow(f1_graph: F1Graph, directory: str, journal: Journal | None = None,
+                chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write f1_graph to nodes.arrow, edges.arrow and constructor_elos.arrow (Arrow IPC files)
+    in directory, chunk_size records per record batch. Hypothetical edges are marked using
+    journal. Requires pyarrow.
+    """
+    import pyarrow as pa
+
+    for name, schema, rows in _arrow_tables(f1_graph, journal):
+        with pa.OSFile(os.path.join(directory, f"{name}.arrow"), 'wb') as sink, \
+                pa.ipc.new_file(sink, schema) as writer:
+            for batch in _record_batches(rows, schema, chunk_size):
+                writer.write_batch(batch)
+
+
+def export_scenario(file_path: str, db_path: str, scenario_id: str | None, directory: str,
+                    formats: tuple[str, ...] = FORMATS, rounding: str = 'exact',
+                    chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Load a fresh base graph from the CSV file at file_path, replay the scenario saved under
+    scenario_id in the ScenarioStore at db_path onto it (or none, if scenario_id is None), and
+    write it to directory in each of formats: graph.ndjson, graph.graphml, and the Parquet and
+    Arrow tables of write_parquet and write_arrow. The scenario's edges are marked hypothetical.
+
+    The graph of a running app is never touched, so any saved scenario can be exported.
+    Raise ValueError for a format not in FORMATS, and otherwise as for ScenarioStore.load.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+
+    f1_graph = load_f1_graph(file_path, rounding)
+    journal = Journal(f1_graph)
+    if scenario_id is not None:
+        ScenarioStore(db_path, graph_version(file_path, rounding)).load(scenario_id, journal)
+
+    os.makedirs(directory, exist_ok=True)
+    if 'ndjson' in formats:
+        write_ndjson(f1_graph, os.path.join(directory, 'graph.ndjson'), journal)
+    if 'graphml' in formats:
+        write_graphml(f1_graph, os.path.join(directory, 'graph.graphml'), journal)
+    if 'parquet' in formats:
+        write_parquet(f1_graph, directory, journal, chunk_size)
+    if 'arrow' in formats:
+        write_arrow(f1_graph, directory, journal, chunk_size)
+
+
+def _arrow_tables(f1_graph: F1Graph, journal: Journal | None) -> list[tuple[str, Any, Iterator[dict[str, Any]]]]:
+    """Return the (name, pyarrow schema, records) of each table written by write_parquet and write_arrow."""
+    import pyarrow as pa
+
+    return [
+        ('nodes', pa.schema([('id', pa.string()), ('label', pa.string()), ('group', pa.string()),
+                             ('elo', pa.float64()), ('rank', pa.int64())]),
+         iter_nodes(f1_graph)),
+        ('edges', pa.schema([('source', pa.string()), ('target', pa.string()), ('elo', pa.float64()),
+                             ('hypothetical', pa.bool_())]),
+         iter_edges(f1_graph, journal)),
+        ('constructor_elos', pa.schema([('constructor', pa.string()), ('driver', pa.string()),
+                                        ('elo', pa.float64())]),
+         iter_constructor_elos(f1_graph))
+    ]
+
+
+def _record_batches(rows: Iterator[dict[str, Any]], schema: Any, chunk_size: int) -> Iterator[Any]:
+    """Yield pyarrow record batches of at most chunk_size rows each, consuming rows lazily."""
+    import pyarrow as pa
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+
+def _graphml_data(key: str, value: Any) -> str:
+    """Return a GraphML <data> element for the given key and value, or '' if value is None."""
+    if value is None:
+        return ''
+    return f'<data key="{key}">{escape(str(value))}</data>'
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the F1 graph, optionally with a saved scenario applied.")
+    parser.add_argument('directory', help="directory to write the exported files to")
+    parser.add_argument('--scenario', default=None, help="id of a saved scenario to apply")
+    parser.add_argument('--data', default='preprocessing/data/final_data.csv', help="CSV file of the base graph")
+    parser.add_argument('--db', default='scenarios.db', help="scenario database")
+    parser.add_argument('--rounding', choices=ROUNDING_MODES, default='exact')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args()
+
+    export_scenario(args.data, args.db, args.scenario, args.directory, tuple(args.formats), args.rounding)
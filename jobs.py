@@ -0,0 +1,114 @@
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+
+class JobQueue:
+    """
+    An in-process queue that runs expensive what-if computations on a pool of background
+    worker threads. The Dash request thread only submits work and polls for the result,
+    so heavy scenarios never block interactive callbacks.
+
+    Submitting a job whose key matches a job that is still pending or running returns the
+    id of that job instead of queueing the same computation twice.
+
+    Instance Attributes:
+        - max_workers (int): the number of worker threads in the pool
+        - max_finished (int): how many finished jobs are kept around for polling
+
+    Representation Invariants:
+        - self.max_workers >= 1
+        - self.max_finished >= 1
+    """
+    max_workers: int
+    max_finished: int
+    _executor: ThreadPoolExecutor
+    _lock: threading.Lock
+    _ids: itertools.count
+    _jobs: dict[str, Future]
+    _finished: OrderedDict[str, Future]
+    _in_flight: dict[Hashable, str]
+
+    def __init__(self, max_workers: int = 2, max_finished: int = 256) -> None:
+        """Initialize an empty JobQueue backed by max_workers threads."""
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="whatif")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._finished = OrderedDict()
+        self._in_flight = {}
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+        """
+        Schedule fn(*args, **kwargs) on the worker pool and return its job id.
+        If a job with the same key is still in flight, return that job's id instead.
+
+        Preconditions:
+         - key is hashable and identifies the computation (e.g. a (driver, constructor) pair)
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return self._in_flight[key]
+
+            job_id = f"job-{next(self._ids)}"
+            self._in_flight[key] = job_id
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._jobs[job_id] = future
+
+        future.add_done_callback(lambda _: self._finish(key, job_id))
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        """
+        Return the status of the given job: one of 'pending', 'running', 'done', 'failed',
+        'cancelled', or 'unknown' if the job id was never issued or has been evicted.
+        """
+        future = self._get(job_id)
+        if future is None:
+            return 'unknown'
+        if future.cancelled():
+            return 'cancelled'
+        if future.running():
+            return 'running'
+        if not future.done():
+            return 'pending'
+        return 'failed' if future.exception() is not None else 'done'
+
+    def in_flight(self) -> int:
+        """Return the number of jobs that are pending or running."""
+        with self._lock:
+            return len(self._jobs)
+
+    def result(self, job_id: str) -> Any:
+        """
+        Return the result of a finished job, re-raising any exception the job raised
+        (or CancelledError if it was cancelled).
+
+        Preconditions:
+         - self.status(job_id) in {'done', 'failed', 'cancelled'}
+        """
+        return self._get(job_id).result(timeout=0)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for the running ones to finish."""
+        self._executor.shutdown(wait=True)
+
+    def _get(self, job_id: str) -> Future | None:
+        """Return the future for the given job id, or None if it is unknown."""
+        with self._lock:
+            return self._jobs.get(job_id) or self._finished.get(job_id)
+
+    def _finish(self, key: Hashable, job_id: str) -> None:
+        """Move a completed job out of the in-flight table, evicting the oldest finished jobs."""
+        with self._lock:
+            if self._in_flight.get(key) == job_id:
+                del self._in_flight[key]
+            future = self._jobs.pop(job_id, None)
+            if future is not None:
+                self._finished[job_id] = future
+            while len(self._finished) > self.max_finished:
+                self._finished.popitem(last=False)
@@ -0,0 +1,260 @@
+from typing import Hashable
+
+from entities import ELO_SCALE, Driver, Constructor, F1Graph
+
+
+class Delta:
+    """
+    A reversible change to an F1Graph: the rating entries and edges written by a what-if
+    simulation, together with the values they replaced.
+
+    Old values are captured, as exact ELO_SCALE units, each time the delta is applied, so
+    applying and reverting a delta both cost O(len(self)) and leave the graph exactly as it was.
+
+    Instance Attributes:
+        - driver_ratings (list): (driver, constructor_name, old_units, new_rating) entries,
+          where old_units is None if the driver had no rating for that constructor
+        - constructor_ratings (list): (constructor, driver, old_units, new_rating) entries,
+          where old_units is None if the constructor had no rating for that driver
+        - new_edges (list): (driver, constructor) edges that were not in the graph before
+          this delta was last applied; empty until it is applied
+
+    Representation Invariants:
+        - no (driver, constructor_name) pair appears twice in driver_ratings
+        - no (constructor, driver) pair appears twice in constructor_ratings
+        - no edge appears twice in new_edges
+    """
+    driver_ratings: list[tuple[Driver, str, int | None, float]]
+    constructor_ratings: list[tuple[Constructor, Driver, int | None, float]]
+    new_edges: list[tuple[Driver, Constructor]]
+    _edges: list[tuple[Driver, Constructor]]
+
+    def __init__(self) -> None:
+        """Initialize an empty Delta."""
+        self.driver_ratings = []
+        self.constructor_ratings = []
+        self.new_edges = []
+        self._edges = []
+
+    def rate_driver(self, driver: Driver, constructor_name: str, rating: float) -> None:
+        """Record that driver's ELO for constructor_name becomes rating."""
+        self.driver_ratings.append((driver, constructor_name, driver.elo_units(constructor_name), rating))
+
+    def rate_constructor(self, constructor: Constructor, driver: Driver, rating: float) -> None:
+        """Record that constructor's ELO entry for driver becomes rating."""
+        self.constructor_ratings.append((constructor, driver, constructor.elo_units(driver), rating))
+
+    def add_edge(self, driver: Driver, constructor: Constructor) -> None:
+        """
+        Record an edge between driver and constructor. The edge is only added (and later
+        removed) if the graph does not already have it when this delta is applied.
+        """
+        if (driver, constructor) not in self._edges:
+            self._edges.append((driver, constructor))
+
+    def keys(self) -> list[tuple]:
+        """
+        Return the rating entries this delta writes, as ('driver', driver, constructor_name)
+        and ('constructor', constructor, driver) keys.
+        """
+        return ([('driver', driver, constructor_name) for driver, constructor_name, _, _ in self.driver_ratings]
+                + [('constructor', constructor, driver) for constructor, driver, _, _ in self.constructor_ratings])
+
+    def apply(self, f1_graph: F1Graph) -> None:
+        """Write this delta's new values into f1_graph and update the affected rankings."""
+        self.driver_ratings = [(driver, constructor_name, driver.elo_units(constructor_name), new_rating)
+                               for driver, constructor_name, _, new_rating in self.driver_ratings]
+        self.constructor_ratings = [(constructor, driver, constructor.elo_units(driver), new_rating)
+                                    for constructor, driver, _, new_rating in self.constructor_ratings]
+        self.new_edges = [edge for edge in self._edges if edge not in f1_graph.edges]
+
+        for driver, constructor_name, _, new_rating in self.driver_ratings:
+            driver.set_elo_units(constructor_name, round(new_rating * ELO_SCALE))
+        for constructor, driver, _, new_rating in self.constructor_ratings:
+            constructor.set_elo_units(driver, round(new_rating * ELO_SCALE))
+        for driver, constructor in self.new_edges:
+            f1_graph.add_edge(driver, constructor)
+        self._update_rankings(f1_graph)
+
+    def revert(self, f1_graph: F1Graph, keep: set[tuple] = frozenset(),
+               keep_edges: set[tuple[Driver, Constructor]] = frozenset()) -> None:
+        """
+        Restore the values this delta replaced in f1_graph and update the affected rankings.
+        Entries whose key is in keep and edges in keep_edges are left as they are, because a
+        later delta has since written them.
+        """
+        for driver, constructor_name, old_units, _ in self.driver_ratings:
+            if ('driver', driver, constructor_name) not in keep:
+                driver.set_elo_units(constructor_name, old_units)
+        for constructor, driver, old_units, _ in self.constructor_ratings:
+            if ('constructor', constructor, driver) not in keep:
+                constructor.set_elo_units(driver, old_units)
+        for edge in self.new_edges:
+            if edge not in keep_edges:
+                f1_graph.edges.discard(edge)
+        self._update_rankings(f1_graph)
+
+    def old_units(self, key: tuple) -> int | None:
+        """Return the value this delta replaced for the given key."""
+        entries = self.driver_ratings if key[0] == 'driver' else self.constructor_ratings
+        return next(old for obj, other, old, _ in entries if (key[0], obj, other) == key)
+
+    def rebase(self, key: tuple, old_units: int | None) -> None:
+        """Replace the value this delta records as having replaced for key with old_units."""
+        entries = self.driver_ratings if key[0] == 'driver' else self.constructor_ratings
+        for i, (obj, other, _, new_rating) in enumerate(entries):
+            if (key[0], obj, other) == key:
+                entries[i] = (obj, other, old_units, new_rating)
+
+    def adopt_edge(self, driver: Driver, constructor: Constructor) -> None:
+        """Take over an edge added by an earlier delta, so that reverting this delta removes it."""
+        self.add_edge(driver, constructor)
+        if (driver, constructor) not in self.new_edges:
+            self.new_edges.append((driver, constructor))
+
+    def _update_rankings(self, f1_graph: F1Graph) -> None:
+        """Update f1_graph's leaderboards for every driver and constructor touched by this delta."""
+        f1_graph.update_rankings({driver for driver, _, _, _ in self.driver_ratings},
+                                 {constructor for constructor, _, _, _ in self.constructor_ratings})
+
+    def __len__(self) -> int:
+        """Return the number of changes recorded in this delta."""
+        return len(self.driver_ratings) + len(self.constructor_ratings) + len(self.new_edges)
+
+
+class Journal:
+    """
+    A history of the deltas applied to an F1Graph, so that hypothetical changes can be undone,
+    redone, reverted individually, or rolled back to a snapshot without reloading the graph.
+
+    Each applied delta is stored under a label (e.g. a (driver_name, constructor_name) pair).
+
+    Instance Attributes:
+        - f1_graph (F1Graph): the graph the deltas are applied to
+        - applied (list): (label, delta) entries currently applied, oldest first
+        - undone (list): (label, delta) entries available to redo, most recently undone last
+
+    Representation Invariants:
+        - every label appears at most once in self.applied
+        - self._deltas == dict(self.applied)
+        - every applied delta appears, in application order, in self._writers[key] for each key it writes
+    """
+    f1_graph: F1Graph
+    applied: list[tuple[Hashable, Delta]]
+    undone: list[tuple[Hashable, Delta]]
+    _deltas: dict[Hashable, Delta]
+    _writers: dict[tuple, list[Delta]]
+
+    def __init__(self, f1_graph: F1Graph) -> None:
+        """Initialize an empty Journal for the given graph."""
+        self.f1_graph = f1_graph
+        self.applied = []
+        self.undone = []
+        self._deltas = {}
+        self._writers = {}
+
+    def apply(self, label: Hashable, delta: Delta) -> None:
+        """
+        Apply delta to the graph and record it under label. This clears the redo history.
+        Raise ValueError if a delta is already applied under label.
+        """
+        if label in self._deltas:
+            raise ValueError(f"A delta is already applied under {label!r}.")
+        self._push(label, delta)
+        self.undone.clear()
+
+    def labels(self) -> list[Hashable]:
+        """Return the labels of the applied deltas, oldest first."""
+        return [label for label, _ in self.applied]
+
+    def undo(self) -> Hashable | None:
+        """Revert the most recently applied delta and return its label, or None if there is none."""
+        if not self.applied:
+            return None
+        label, delta = self.applied[-1]
+        self._remove(label)
+        self.undone.append((label, delta))
+        return label
+
+    def redo(self) -> Hashable | None:
+        """Re-apply the most recently undone delta and return its label, or None if there is none."""
+        if not self.undone:
+            return None
+        label, delta = self.undone.pop()
+        self._push(label, delta)
+        return label
+
+    def revert(self, label: Hashable) -> bool:
+        """
+        Revert the delta recorded under label, wherever it is in the history, and forget it.
+        Any later delta that writes the same entry takes over the value this delta replaced,
+        so the result is exact and costs O(len(delta)) apart from removing the history entry.
+        Return whether a delta with that label was found. This clears the redo history.
+        """
+        if label not in self._deltas:
+            return False
+        self._remove(label)
+        self.undone.clear()
+        return True
+
+    def snapshot(self) -> list[tuple[Hashable, Delta]]:
+        """Return a snapshot of the applied deltas that can later be passed to restore."""
+        return list(self.applied)
+
+    def restore(self, snapshot: list[tuple[Hashable, Delta]]) -> None:
+        """
+        Return the graph to the state it was in when snapshot was taken, reverting and
+        applying only the deltas that differ between then and now. This clears the redo history.
+        """
+        common = 0
+        while (common < len(self.applied) and common < len(snapshot)
+               and self.applied[common][1] is snapshot[common][1]):
+            common += 1
+
+        for label, _ in reversed(self.applied[common:]):
+            self._remove(label)
+        for label, delta in snapshot[common:]:
+            self._push(label, delta)
+        self.undone.clear()
+
+    def clear(self) -> None:
+        """Revert every applied delta and forget the whole history."""
+        self.restore([])
+
+    def _push(self, label: Hashable, delta: Delta) -> None:
+        """Apply delta on top of the history under label."""
+        delta.apply(self.f1_graph)
+        self.applied.append((label, delta))
+        self._deltas[label] = delta
+        for key in delta.keys():
+            self._writers.setdefault(key, []).append(delta)
+
+    def _remove(self, label: Hashable) -> None:
+        """
+        Revert the delta applied under label and remove it from the history. For each entry
+        it writes that a later delta also writes, the graph keeps the later value and the next
+        writer is re-based onto the value this delta replaced.
+        """
+        delta = self._deltas.pop(label)
+        keep = set()
+        for key in delta.keys():
+            writers = self._writers[key]
+            position = writers.index(delta)
+            if position + 1 < len(writers):
+                writers[position + 1].rebase(key, delta.old_units(key))
+                keep.add(key)
+            del writers[position]
+            if not writers:
+                del self._writers[key]
+
+        # Edges this delta added stay in the graph while another applied delta still rates the pair
+        keep_edges = set()
+        for driver, constructor in delta.new_edges:
+            heirs = (self._writers.get(('driver', driver, constructor.constructor_name))
+                     or self._writers.get(('constructor', constructor, driver)))
+            if heirs:
+                heirs[0].adopt_edge(driver, constructor)
+                keep_edges.add((driver, constructor))
+
+        delta.revert(self.f1_graph, keep, keep_edges)
+        self.applied.remove((label, delta))
@@ -1,14 +1,34 @@
+import threading
+
 import dash
 from dash import dcc, html, Input, Output, State, dash_table
 import dash_cytoscape as cyto
 
 cyto.load_extra_layouts()
-from prediction import simulate_whatif_for_nodes
+from prediction import Scenario, apply_whatif, prepare_whatif
 from entities import load_f1_graph
+from jobs import JobQueue
+from journal import Journal
+from scenario_store import CorruptScenarioError, ScenarioStore, graph_version
 
 FILE_PATH = r"preprocessing/data/final_data.csv"
+SCENARIO_DB_PATH = r"scenarios.db"
 global_f1_graph = load_f1_graph(FILE_PATH)
 
+# What-if computations run on background workers. graph_lock is only held while a delta is
+# applied to or reverted from the shared graph; claimed_pairs holds every pair that is applied
+# or being simulated, under its own short-lived lock, so request callbacks never wait on a job.
+whatif_jobs = JobQueue()
+graph_lock = threading.Lock()
+claims_lock = threading.Lock()
+claimed_pairs = set()
+# Every hypothetical edge is journaled so that removing it restores the graph exactly.
+whatif_journal = Journal(global_f1_graph)
+# Table rows of the applied simulations, by (driver_name, constructor_name), guarded by graph_lock.
+# Every page load rebuilds its hypothetical edges and table from these.
+whatif_rows = {}
+scenario_store = ScenarioStore(SCENARIO_DB_PATH, graph_version(FILE_PATH, global_f1_graph.rounding))
+
 elements = []
 
 for driver in global_f1_graph.drivers.values():
@@ -76,160 +96,261 @@ app.index_string = """
 </html>
 """
 
-layout_store = dcc.Store(id="layout-store", data={"name": "fcose"})
-
-app.layout = html.Div(
-    style={
-        "width": "100vw",
-        "height": "100vh",
-        "postiion": "relative",
-        "display": "flex",
-        "flexDirection": "row",
-        "fontFamily": "'Red Hat Display', sans-serif",
-        "backgroundColor": "#1B1F23",
-        "color": "white",
-        "margin": "0",
-        "padding": "0"
-    },
-    children=[
-        html.Img(
-            src="https://www.formula1.com/etc/designs/fom-website/images/f1_logo.svg",
-            style={"position": "absolute",
-                   "top": "20px",
-                   "left": "20px",
-                   "width": "100px",
-                   "zIndex": "1000"}
-        ),
-        cyto.Cytoscape(
-            id="cytoscape",
-            elements=elements,
-            layout={
-                "name": "fcose",
-                "randomize": True,
-                "idealEdgeLength": 150,
-                "nodeRepulsion": 12000,
-                "nodeSeparation": 200,
-                "gravity": 0.1,
-                "packComponents": True,
-                "animate": True
-            },
-            style={"width": "70vw", "height": "100vh"},
-            stylesheet=[
-                {
-                    "selector": "node",
-                    "style": {
-                        "grabbable": "true",
-                        "label": "data(label)",
-                        "font-size": "20px",
-                        "text-halign": "center",
-                        "text-valign": "center",
-                        "background-color": "#3C3F44",
-                        "color": "#FFFFFF",
-                        "width": "80px",
-                        "height": "80px",
-                        "border-width": "0px"
-                    }
+
+def serve_layout():
+    """
+    Build the page layout. It is rebuilt on every page load, so a reloaded page shows the
+    hypothetical edges and table rows of every simulation applied to the shared graph.
+    """
+    with graph_lock:
+        rows = [dict(row) for row in whatif_rows.values()]
+
+    return html.Div(
+        style={
+            "width": "100vw",
+            "height": "100vh",
+            "postiion": "relative",
+            "display": "flex",
+            "flexDirection": "row",
+            "fontFamily": "'Red Hat Display', sans-serif",
+            "backgroundColor": "#1B1F23",
+            "color": "white",
+            "margin": "0",
+            "padding": "0"
+        },
+        children=[
+            html.Img(
+                src="https://www.formula1.com/etc/designs/fom-website/images/f1_logo.svg",
+                style={"position": "absolute",
+                       "top": "20px",
+                       "left": "20px",
+                       "width": "100px",
+                       "zIndex": "1000"}
+            ),
+            cyto.Cytoscape(
+                id="cytoscape",
+                elements=elements + [hypothetical_edge(row["Driver"], row["Constructor"]) for row in rows],
+                layout={
+                    "name": "fcose",
+                    "randomize": True,
+                    "idealEdgeLength": 150,
+                    "nodeRepulsion": 12000,
+                    "nodeSeparation": 200,
+                    "gravity": 0.1,
+                    "packComponents": True,
+                    "animate": True
                 },
-                {"selector": ".driver-node", "style": {"background-color": "#2978F0"}},
-                {"selector": ".constructor-node", "style": {"background-color": "#22A55F"}},
-                {"selector": ".real-edge", "style": {"line-color": "#888888", "width": 2}},
-                {"selector": ".hypothetical-edge",
-                 "style": {"line-color": "#FFAA00", "line-style": "dashed", "width": 3}},
-                {"selector": ".hypothetical-edge:selected",
-                 "style": {"line-color": "#FF5500", "width": 5}}
-            ],
-            boxSelectionEnabled=False,
-            autounselectify=False,
-            minZoom=0.2,
-            maxZoom=3,
-            userPanningEnabled=True,
-            userZoomingEnabled=True,
-            autoungrabify=False
-        ),
-        dcc.Store(id="node-store", data=[]),
-        layout_store,
-
-        dcc.Store(id="edge-store", data=None),
-
-        dcc.Interval(id="freeze-layout-interval", interval=5000, n_intervals=0, max_intervals=1),
-        html.Div(
-            style={
-                "width": "30vw",
-                "height": "100vh",
-                "display": "flex",
-                "flexDirection": "column",
-                "justifyContent": "flex-start",
-                "padding": "20px",
-                "backgroundColor": "#1B1F23"
-            },
-            children=[
-                html.H2("Formula 1 Driver ELO Simulator", style={"textAlign": "center", "marginTop": "0"}),
-                html.P(
-                    "Tap one driver node, then tap one constructor node, then press the button below to add a hypothetical edge.",
-                    style={"textAlign": "center", "marginBottom": "10px"}
-                ),
-                html.Button(
-                    "Add Hypothetical Edge",
-                    id="add-edge-btn",
-                    n_clicks=0,
-                    style={
-                        "fontSize": "18px",
-                        "padding": "10px",
-                        "backgroundColor": "#333",
-                        "color": "white",
-                        "border": "none",
-                        "borderRadius": "5px",
-                        "cursor": "pointer",
-                        "marginBottom": "20px"
-                    }
-                ),
-                html.Button(
-                    "Remove Hypothetical Edge",
-                    id="remove-edge-btn",
-                    n_clicks=0,
-                    style={
-                        "fontSize": "18px",
-                        "padding": "10px",
-                        "backgroundColor": "#AA3333",
-                        "color": "white",
-                        "border": "none",
-                        "borderRadius": "5px",
-                        "cursor": "pointer",
-                        "marginBottom": "20px"
-                    }
-                ),
-                html.Div(
-                    id="simulation-output",
-                    style={"textAlign": "center", "marginBottom": "20px", "fontSize": "16px"}
-                ),
-                dash_table.DataTable(
-                    id="simulation-table",
-                    columns=[
-                        {"name": "Driver", "id": "Driver"},
-                        {"name": "Constructor", "id": "Constructor"},
-                        {"name": "Prev. ELO", "id": "PrevELO"},
-                        {"name": "What-If ELO", "id": "HypoELO"},
-                        {"name": "New Final ELO", "id": "NewFinalELO"}
-                    ],
-                    data=[],
-                    row_selectable='single',
-                    style_table={"overflowX": "auto"},
-                    style_header={
-                        "backgroundColor": "#111111",
-                        "color": "white",
-                        "fontWeight": "bold"
+                style={"width": "70vw", "height": "100vh"},
+                stylesheet=[
+                    {
+                        "selector": "node",
+                        "style": {
+                            "grabbable": "true",
+                            "label": "data(label)",
+                            "font-size": "20px",
+                            "text-halign": "center",
+                            "text-valign": "center",
+                            "background-color": "#3C3F44",
+                            "color": "#FFFFFF",
+                            "width": "80px",
+                            "height": "80px",
+                            "border-width": "0px"
+                        }
                     },
-                    style_data={"backgroundColor": "#1B1F23", "color": "white"},
-                    style_cell={
-                        "textAlign": "center",
-                        "fontSize": "16px",
-                        "fontFamily": "'Red Hat Display', sans-serif"
-                    }
-                )
-            ]
-        )
-    ]
-)
+                    {"selector": ".driver-node", "style": {"background-color": "#2978F0"}},
+                    {"selector": ".constructor-node", "style": {"background-color": "#22A55F"}},
+                    {"selector": ".real-edge", "style": {"line-color": "#888888", "width": 2}},
+                    {"selector": ".hypothetical-edge",
+                     "style": {"line-color": "#FFAA00", "line-style": "dashed", "width": 3}},
+                    {"selector": ".hypothetical-edge:selected",
+                     "style": {"line-color": "#FF5500", "width": 5}}
+                ],
+                boxSelectionEnabled=False,
+                autounselectify=False,
+                minZoom=0.2,
+                maxZoom=3,
+                userPanningEnabled=True,
+                userZoomingEnabled=True,
+                autoungrabify=False
+            ),
+            dcc.Store(id="node-store", data=[]),
+            dcc.Store(id="layout-store", data={"name": "fcose"}),
+
+            dcc.Store(id="edge-store", data=None),
+            dcc.Store(id="pending-jobs", data=[]),
+            dcc.Store(id="scenario-moves", data=[]),
+            dcc.Interval(id="job-poll-interval", interval=500, n_intervals=0, disabled=True),
+
+            dcc.Interval(id="freeze-layout-interval", interval=5000, n_intervals=0, max_intervals=1),
+            html.Div(
+                style={
+                    "width": "30vw",
+                    "height": "100vh",
+                    "display": "flex",
+                    "flexDirection": "column",
+                    "justifyContent": "flex-start",
+                    "padding": "20px",
+                    "backgroundColor": "#1B1F23"
+                },
+                children=[
+                    html.H2("Formula 1 Driver ELO Simulator", style={"textAlign": "center", "marginTop": "0"}),
+                    html.P(
+                        "Tap one driver node, then tap one constructor node, then press the button below to add a hypothetical edge.",
+                        style={"textAlign": "center", "marginBottom": "10px"}
+                    ),
+                    html.Button(
+                        "Add Hypothetical Edge",
+                        id="add-edge-btn",
+                        n_clicks=0,
+                        style={
+                            "fontSize": "18px",
+                            "padding": "10px",
+                            "backgroundColor": "#333",
+                            "color": "white",
+                            "border": "none",
+                            "borderRadius": "5px",
+                            "cursor": "pointer",
+                            "marginBottom": "20px"
+                        }
+                    ),
+                    html.Div(
+                        style={"display": "flex", "flexDirection": "row", "marginBottom": "10px"},
+                        children=[
+                            html.Button(
+                                "Add to Scenario",
+                                id="queue-move-btn",
+                                n_clicks=0,
+                                style={
+                                    "flex": "1",
+                                    "fontSize": "16px",
+                                    "padding": "8px",
+                                    "backgroundColor": "#333",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "5px",
+                                    "cursor": "pointer",
+                                    "marginRight": "10px"
+                                }
+                            ),
+                            html.Button(
+                                "Run Scenario",
+                                id="run-scenario-btn",
+                                n_clicks=0,
+                                style={
+                                    "flex": "1",
+                                    "fontSize": "16px",
+                                    "padding": "8px",
+                                    "backgroundColor": "#333",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "5px",
+                                    "cursor": "pointer"
+                                }
+                            )
+                        ]
+                    ),
+                    html.Div(
+                        id="scenario-moves-output",
+                        style={"textAlign": "center", "marginBottom": "20px", "fontSize": "14px"}
+                    ),
+                    html.Button(
+                        "Remove Hypothetical Edge",
+                        id="remove-edge-btn",
+                        n_clicks=0,
+                        style={
+                            "fontSize": "18px",
+                            "padding": "10px",
+                            "backgroundColor": "#AA3333",
+                            "color": "white",
+                            "border": "none",
+                            "borderRadius": "5px",
+                            "cursor": "pointer",
+                            "marginBottom": "20px"
+                        }
+                    ),
+                    html.Div(
+                        style={"display": "flex", "flexDirection": "row", "marginBottom": "20px"},
+                        children=[
+                            dcc.Input(
+                                id="scenario-id-input",
+                                type="text",
+                                placeholder="Scenario id",
+                                style={
+                                    "flex": "1",
+                                    "fontSize": "16px",
+                                    "padding": "8px",
+                                    "marginRight": "10px",
+                                    "borderRadius": "5px",
+                                    "border": "none"
+                                }
+                            ),
+                            html.Button(
+                                "Save Scenario",
+                                id="save-scenario-btn",
+                                n_clicks=0,
+                                style={
+                                    "fontSize": "16px",
+                                    "padding": "8px",
+                                    "backgroundColor": "#333",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "5px",
+                                    "cursor": "pointer",
+                                    "marginRight": "10px"
+                                }
+                            ),
+                            html.Button(
+                                "Load Scenario",
+                                id="load-scenario-btn",
+                                n_clicks=0,
+                                style={
+                                    "fontSize": "16px",
+                                    "padding": "8px",
+                                    "backgroundColor": "#333",
+                                    "color": "white",
+                                    "border": "none",
+                                    "borderRadius": "5px",
+                                    "cursor": "pointer"
+                                }
+                            )
+                        ]
+                    ),
+                    html.Div(
+                        id="simulation-output",
+                        style={"textAlign": "center", "marginBottom": "20px", "fontSize": "16px"}
+                    ),
+                    dash_table.DataTable(
+                        id="simulation-table",
+                        columns=[
+                            {"name": "Driver", "id": "Driver"},
+                            {"name": "Constructor", "id": "Constructor"},
+                            {"name": "Prev. ELO", "id": "PrevELO"},
+                            {"name": "What-If ELO", "id": "HypoELO"},
+                            {"name": "New Final ELO", "id": "NewFinalELO"},
+                            {"name": "New Rank", "id": "NewRank"}
+                        ],
+                        data=rows,
+                        row_selectable='single',
+                        style_table={"overflowX": "auto"},
+                        style_header={
+                            "backgroundColor": "#111111",
+                            "color": "white",
+                            "fontWeight": "bold"
+                        },
+                        style_data={"backgroundColor": "#1B1F23", "color": "white"},
+                        style_cell={
+                            "textAlign": "center",
+                            "fontSize": "16px",
+                            "fontFamily": "'Red Hat Display', sans-serif"
+                        }
+                    )
+                ]
+            )
+        ]
+    )
+
+
+app.layout = serve_layout
 
 
 @app.callback(
@@ -321,89 +442,170 @@ def update_edge_store(tapped_edge):
     return None
 
 
+@app.callback(
+    [
+        Output("scenario-moves", "data"),
+        Output("scenario-moves-output", "children")
+    ],
+    [
+        Input("queue-move-btn", "n_clicks"),
+        Input("run-scenario-btn", "n_clicks")
+    ],
+    [
+        State("node-store", "data"),
+        State("scenario-moves", "data")
+    ]
+)
+def queue_scenario_move(queue_n_clicks, run_n_clicks, node_store, scenario_moves):
+    """
+    Collect the tapped driver-constructor pair into the scenario being built, or clear the
+    collected moves once the scenario has been submitted with the run button.
+    """
+    ctx = dash.callback_context
+    if not ctx.triggered:
+        return dash.no_update, dash.no_update
+    trigger = ctx.triggered[0]['prop_id'].split('.')[0]
+    scenario_moves = scenario_moves or []
+
+    if trigger == "run-scenario-btn":
+        return [], ""
+
+    if not node_store or len(node_store) != 2 or node_store[0]["group"] == node_store[1]["group"]:
+        return scenario_moves, "Tap one driver and one constructor to add a move to the scenario."
+
+    node1, node2 = node_store
+    move = [node1["label"], node2["label"]] if node1["group"] == "driver" else [node2["label"], node1["label"]]
+    if move not in scenario_moves:
+        scenario_moves = scenario_moves + [move]
+    summary = ", ".join(f"{driver} → {constructor}" for driver, constructor in scenario_moves)
+    return scenario_moves, f"Scenario: {summary}"
+
+
 @app.callback(
     [
         Output("cytoscape", "elements"),
         Output("simulation-table", "data"),
-        Output("simulation-output", "children")
+        Output("simulation-output", "children"),
+        Output("pending-jobs", "data"),
+        Output("job-poll-interval", "disabled")
     ],
     [
         Input("add-edge-btn", "n_clicks"),
-        Input("remove-edge-btn", "n_clicks")
+        Input("remove-edge-btn", "n_clicks"),
+        Input("job-poll-interval", "n_intervals"),
+        Input("save-scenario-btn", "n_clicks"),
+        Input("load-scenario-btn", "n_clicks"),
+        Input("run-scenario-btn", "n_clicks")
     ],
     [
         State("node-store", "data"),
         State("cytoscape", "elements"),
         State("simulation-table", "data"),
         State("simulation-table", "selected_rows"),
-        State("edge-store", "data")  # New state parameter
+        State("edge-store", "data"),  # New state parameter
+        State("pending-jobs", "data"),
+        State("scenario-id-input", "value"),
+        State("scenario-moves", "data")
     ]
 )
-def manage_edges(add_n_clicks, remove_n_clicks, node_store, current_elements, table_data, selected_rows, edge_store):
+def manage_edges(add_n_clicks, remove_n_clicks, n_intervals, save_n_clicks, load_n_clicks, run_n_clicks,
+                 node_store, current_elements, table_data, selected_rows, edge_store, pending_jobs, scenario_id,
+                 scenario_moves):
     """
     Manage both adding and removing hypothetical edges when the respective buttons are clicked.
     Now supports removing edges by either:
     1. Selecting them in the table and clicking remove
     2. Clicking directly on the edge in the graph and clicking remove
+
+    Adding an edge or running a multi-edge scenario only submits the what-if simulation to the
+    background job queue; the job-poll-interval then collects finished jobs and adds their
+    edges and table rows.
+
+    Saving stores the current hypothetical edges as a scenario and reports its id; loading
+    replaces the hypothetical edges with those of the scenario whose id is entered. The edges
+    are shared by every session, so loading is refused while any simulation is still running.
     """
     # Initial message and data checks
     message = "Tap a driver and a constructor node, then click a button to add/remove an edge."
+    pending_jobs = pending_jobs or []
+    polling_disabled = not pending_jobs
 
     # Determine which button was clicked
     ctx = dash.callback_context
     if not ctx.triggered:
-        return current_elements, table_data, message
+        return current_elements, table_data, message, pending_jobs, polling_disabled
     trigger = ctx.triggered[0]['prop_id'].split('.')[0]
 
-    # Handle adding edge (existing functionality unchanged)
+    # Handle adding edge
     if trigger == "add-edge-btn":
         if not node_store or len(node_store) != 2:
-            return current_elements, table_data, "Please tap exactly 2 nodes (one driver, one constructor)."
+            return (current_elements, table_data, "Please tap exactly 2 nodes (one driver, one constructor).",
+                    pending_jobs, polling_disabled)
 
         node1, node2 = node_store
         if node1["group"] == node2["group"]:
-            return current_elements, table_data, "Selected nodes must be from different bipartite groups."
+            return (current_elements, table_data, "Selected nodes must be from different bipartite groups.",
+                    pending_jobs, polling_disabled)
 
         driver_name, constructor_name = (node1["label"], node2["label"]) if node1["group"] == "driver" else (
             node2["label"], node1["label"])
 
-        # Check if edge already exists
-        if any(
-                elem.get("data", {}).get("source") == f"driver-{driver_name}" and
-                elem.get("data", {}).get("target") == f"constructor-{constructor_name}"
-                for elem in current_elements
-        ):
-            return current_elements, table_data, f"{driver_name} is already adjacent to {constructor_name}."
-
-        # Simulate the what-if scenario
-        result = simulate_whatif_for_nodes(global_f1_graph, driver_name, constructor_name)
-        if result is None:
-            return current_elements, table_data, "Simulation failed: invalid names."
-
-        prev_elo, whatif_rating, new_final_elo = result
-
-        # Add hypothetical edge
-        new_edge = {
-            "data": {
-                "id": f"hypothetical-{driver_name}-{constructor_name}",
-                "source": f"driver-{driver_name}",
-                "target": f"constructor-{constructor_name}"
-            },
-            "classes": "hypothetical-edge"
-        }
-        current_elements.append(new_edge)
-
-        # Add new row to simulation table
-        new_row = {
-            "Driver": driver_name,
-            "Constructor": constructor_name,
-            "PrevELO": prev_elo,
-            "HypoELO": whatif_rating,
-            "NewFinalELO": new_final_elo
-        }
-        table_data.append(new_row)
-
-        message = f"Hypothetical edge added for {driver_name} with {constructor_name}."
+        # Check if edge already exists, is being simulated, or has just been applied
+        unavailable = claim_pairs({(driver_name, constructor_name)}, current_elements)
+        if unavailable:
+            return current_elements, table_data, unavailable, pending_jobs, polling_disabled
+
+        # Submit the what-if scenario; identical in-flight requests share one job
+        job_id = whatif_jobs.submit(("whatif", driver_name, constructor_name), run_whatif_job,
+                                    driver_name, constructor_name)
+        pending_jobs = pending_jobs + [{"job": job_id, "moves": [[driver_name, constructor_name]]}]
+        message = f"Simulating {driver_name} with {constructor_name}..."
+        return current_elements, table_data, message, pending_jobs, False
+
+    # Handle running the collected multi-edge scenario as one batched job
+    elif trigger == "run-scenario-btn":
+        if not scenario_moves:
+            return (current_elements, table_data, "Add at least one move to the scenario first.",
+                    pending_jobs, polling_disabled)
+
+        moves = frozenset((driver_name, constructor_name) for driver_name, constructor_name in scenario_moves)
+        unavailable = claim_pairs(moves, current_elements)
+        if unavailable:
+            return current_elements, table_data, unavailable, pending_jobs, polling_disabled
+
+        job_id = whatif_jobs.submit(("scenario", moves), run_scenario_job, moves)
+        pending_jobs = pending_jobs + [{"job": job_id, "moves": [list(move) for move in sorted(moves)]}]
+        message = f"Simulating a scenario of {len(moves)} moves..."
+        return current_elements, table_data, message, pending_jobs, False
+
+    # Handle finished background jobs
+    elif trigger == "job-poll-interval":
+        still_pending = []
+        for job in pending_jobs:
+            status = whatif_jobs.status(job["job"])
+            if status in ("pending", "running"):
+                still_pending.append(job)
+                continue
+
+            if status != "done":
+                message = "Simulation failed for " + ", ".join(
+                    f"{driver_name} with {constructor_name}" for driver_name, constructor_name in job["moves"]) + "."
+                continue
+
+            for new_row in whatif_jobs.result(job["job"]):
+                driver_name, constructor_name = new_row["Driver"], new_row["Constructor"]
+                # Add hypothetical edge and a new row to the simulation table
+                current_elements.append(hypothetical_edge(driver_name, constructor_name))
+                table_data.append(new_row)
+
+            if len(job["moves"]) == 1:
+                message = f"Hypothetical edge added for {driver_name} with {constructor_name}."
+            else:
+                message = f"Scenario of {len(job['moves'])} hypothetical edges added."
+
+        if still_pending and len(still_pending) == len(pending_jobs):
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        return current_elements, table_data, message, still_pending, not still_pending
 
     # Handle removing edge (updated functionality)
     elif trigger == "remove-edge-btn":
@@ -414,38 +616,222 @@ def manage_edges(add_n_clicks, remove_n_clicks, node_store, current_elements, ta
         # Option 1: Remove via edge selection in graph
         if edge_store and edge_store.get('id', '').startswith('hypothetical-'):
             edge_id = edge_store['id']
-            # Extract names from edge ID
-            parts = edge_id.split('-')
-            driver_name = parts[1]
-            constructor_name = parts[2]
-
-            # Remove edge from elements
-            new_elements = [elem for elem in new_elements if elem.get('data', {}).get('id') != edge_id]
-            # Remove corresponding row from table
-            new_table_data = [row for row in new_table_data if not (
-                    row['Driver'] == driver_name and row['Constructor'] == constructor_name
-            )]
+            # Extract names from the edge endpoints (names may themselves contain '-')
+            driver_name = edge_store['source'][len('driver-'):]
+            constructor_name = edge_store['target'][len('constructor-'):]
+            reverted = revert_whatif(driver_name, constructor_name)
+            edge_ids = {f"hypothetical-{driver}-{constructor}" for driver, constructor in reverted} | {edge_id}
+
+            # Remove edge (and the rest of its scenario) from elements
+            new_elements = [elem for elem in new_elements if elem.get('data', {}).get('id') not in edge_ids]
+            # Remove corresponding rows from table
+            new_table_data = [row for row in new_table_data if (row['Driver'], row['Constructor']) not in reverted]
             removed = True
             message = f"Removed hypothetical edge between {driver_name} and {constructor_name}."
+            if len(reverted) > 1:
+                message = f"Removed the {len(reverted)} hypothetical edges of the scenario containing " \
+                          f"{driver_name} and {constructor_name}."
 
         # Option 2: Remove via table selection
         if selected_rows and not removed:
-            for idx in reversed(sorted(selected_rows)):
+            reverted = set()
+            for idx in selected_rows:
                 if idx < len(new_table_data):
-                    row = new_table_data.pop(idx)
-                    driver_name = row['Driver']
-                    constructor_name = row['Constructor']
-                    edge_id = f"hypothetical-{driver_name}-{constructor_name}"
-                    new_elements = [elem for elem in new_elements if elem.get('data', {}).get('id') != edge_id]
+                    row = new_table_data[idx]
+                    reverted |= revert_whatif(row['Driver'], row['Constructor'])
+                    reverted.add((row['Driver'], row['Constructor']))
+            edge_ids = {f"hypothetical-{driver}-{constructor}" for driver, constructor in reverted}
+            new_elements = [elem for elem in new_elements if elem.get('data', {}).get('id') not in edge_ids]
+            new_table_data = [row for row in new_table_data if (row['Driver'], row['Constructor']) not in reverted]
             message = "Removed selected hypothetical edges."
             removed = True
 
         if not removed:
             message = "Please select a hypothetical edge (click on it) or select table rows to remove."
 
-        return new_elements, new_table_data, message
+        return new_elements, new_table_data, message, pending_jobs, polling_disabled
+
+    # Handle saving the current hypothetical edges as a scenario
+    elif trigger == "save-scenario-btn":
+        with graph_lock:
+            saved_id = scenario_store.save(whatif_journal)
+        message = f"Saved scenario {saved_id}."
+
+    # Handle loading a saved scenario in place of the current hypothetical edges
+    elif trigger == "load-scenario-btn":
+        scenario_id = (scenario_id or "").strip()
+        # Loading replaces the hypothetical edges of every session, so never race a running job
+        if whatif_jobs.in_flight():
+            return (current_elements, table_data, "Simulations are still running; load the scenario once they finish.",
+                    pending_jobs, polling_disabled)
+        try:
+            with graph_lock:
+                replaced = applied_pairs()
+                rows = scenario_store.load(scenario_id, whatif_journal)
+                new_table_data = [table_row(driver_name, constructor_name, prev_elo, whatif_rating, new_final_elo)
+                                  for driver_name, constructor_name, prev_elo, whatif_rating, new_final_elo in rows]
+                whatif_rows.clear()
+                whatif_rows.update(((row["Driver"], row["Constructor"]), row) for row in new_table_data)
+                with claims_lock:
+                    claimed_pairs.difference_update(replaced)
+                    claimed_pairs.update(applied_pairs())
+        except (KeyError, ValueError):
+            return (current_elements, table_data, f"No scenario {scenario_id!r} saved for this data set.",
+                    pending_jobs, polling_disabled)
+        except CorruptScenarioError:
+            return (current_elements, table_data, f"Scenario {scenario_id!r} is corrupt and could not be loaded.",
+                    pending_jobs, polling_disabled)
+
+        new_elements = [elem for elem in current_elements if elem.get("classes") != "hypothetical-edge"]
+        new_elements.extend(hypothetical_edge(row["Driver"], row["Constructor"]) for row in new_table_data)
+        message = f"Loaded scenario {scenario_id}, replacing the hypothetical edges of every session."
+        return new_elements, new_table_data, message, pending_jobs, polling_disabled
+
+    return current_elements, table_data, message, pending_jobs, polling_disabled
+
+
+def run_whatif_job(driver_name: str, constructor_name: str) -> list[dict]:
+    """
+    Simulate driver_name with constructor_name on the shared graph from a background worker
+    and return a single-element list of its simulation table row. Raise ValueError, releasing
+    the pair's claim, if either name does not exist in the graph or the pair is already adjacent.
+    """
+    try:
+        # Rating only reads the graph, so the lock is held just while the delta is applied
+        prev_elo, whatif_rating, delta = prepare_whatif(global_f1_graph, driver_name, constructor_name)
+        with graph_lock:
+            apply_whatif(global_f1_graph, whatif_journal, (driver_name, constructor_name), delta)
+            return record_rows([(driver_name, constructor_name, prev_elo, whatif_rating)])
+    except ValueError:
+        release_pairs({(driver_name, constructor_name)})
+        raise
+
+
+def run_scenario_job(moves: frozenset[tuple[str, str]]) -> list[dict]:
+    """
+    Resolve a multi-edge Scenario on the shared graph from a background worker and return a
+    simulation table row per move.
+    Raise ValueError, releasing the claims on moves, if any move is invalid.
+    """
+    try:
+        ratings, delta = Scenario(list(moves)).prepare(global_f1_graph)
+        with graph_lock:
+            apply_whatif(global_f1_graph, whatif_journal, moves, delta)
+            return record_rows([(driver_name, constructor_name, prev_elo, whatif_rating)
+                                for (driver_name, constructor_name), (prev_elo, whatif_rating)
+                                in sorted(ratings.items())])
+    except ValueError:
+        release_pairs(moves)
+        raise
+
+
+def record_rows(simulated: list[tuple[str, str, float, int]]) -> list[dict]:
+    """
+    Record a simulation table row for each (driver_name, constructor_name, prev_elo, whatif_rating)
+    just applied to the shared graph, so reloaded pages can show it, and return the rows.
+
+    Preconditions:
+      - graph_lock is held by the caller
+    """
+    rows = [table_row(driver_name, constructor_name, prev_elo, whatif_rating,
+                      global_f1_graph.drivers[driver_name].final_elo)
+            for driver_name, constructor_name, prev_elo, whatif_rating in simulated]
+    whatif_rows.update(((row["Driver"], row["Constructor"]), row) for row in rows)
+    return [dict(row) for row in rows]
+
+
+def table_row(driver_name: str, constructor_name: str, prev_elo: float, whatif_rating: float,
+              new_final_elo: float) -> dict:
+    """
+    Return the simulation table row for a simulated pair, ranking the driver on the shared graph.
+
+    Preconditions:
+      - graph_lock is held by the caller
+    """
+    return {
+        "Driver": driver_name,
+        "Constructor": constructor_name,
+        "PrevELO": prev_elo,
+        "HypoELO": whatif_rating,
+        "NewFinalELO": new_final_elo,
+        "NewRank": global_f1_graph.driver_ranks[None].rank_of(driver_name)
+    }
+
+
+def hypothetical_edge(driver_name: str, constructor_name: str) -> dict:
+    """Return the cytoscape element for the hypothetical edge between driver_name and constructor_name."""
+    return {
+        "data": {
+            "id": f"hypothetical-{driver_name}-{constructor_name}",
+            "source": f"driver-{driver_name}",
+            "target": f"constructor-{constructor_name}"
+        },
+        "classes": "hypothetical-edge"
+    }
+
+
+def claim_pairs(pairs: set[tuple[str, str]], current_elements: list[dict]) -> str | None:
+    """
+    Claim every (driver_name, constructor_name) pair in pairs for a new simulation, or return
+    a message explaining why one of them cannot be simulated: it is already adjacent in the
+    graph, or it is applied or being simulated (possibly from another session). Either all of
+    pairs are claimed or none are.
+    """
+    for driver_name, constructor_name in sorted(pairs):
+        if any(
+                elem.get("data", {}).get("source") == f"driver-{driver_name}" and
+                elem.get("data", {}).get("target") == f"constructor-{constructor_name}"
+                for elem in current_elements
+        ):
+            return f"{driver_name} is already adjacent to {constructor_name}."
+    with claims_lock:
+        for driver_name, constructor_name in sorted(pairs):
+            if (driver_name, constructor_name) in claimed_pairs:
+                return (f"{driver_name} with {constructor_name} is already simulated or being simulated; "
+                        f"reload the page to see every applied edge.")
+        claimed_pairs.update(pairs)
+    return None
+
+
+def release_pairs(pairs: set[tuple[str, str]]) -> None:
+    """Release the claims on those of pairs that are not applied in the journal."""
+    with graph_lock:
+        applied = applied_pairs()
+    with claims_lock:
+        claimed_pairs.difference_update(set(pairs) - applied)
 
-    return current_elements, table_data, message
+
+def applied_pairs() -> set[tuple[str, str]]:
+    """
+    Return every (driver_name, constructor_name) pair applied in the journal.
+
+    Preconditions:
+      - graph_lock is held by the caller
+    """
+    pairs = set()
+    for label in whatif_journal.labels():
+        pairs.update(label if isinstance(label, frozenset) else {label})
+    return pairs
+
+
+def revert_whatif(driver_name: str, constructor_name: str) -> set[tuple[str, str]]:
+    """
+    Undo the what-if simulation of driver_name with constructor_name on the shared graph and
+    return the pairs it removed. A pair resolved as part of a multi-edge scenario reverts the
+    whole scenario.
+    """
+    with graph_lock:
+        if whatif_journal.revert((driver_name, constructor_name)):
+            reverted = {(driver_name, constructor_name)}
+        else:
+            reverted = next((set(label) for label in whatif_journal.labels()
+                             if isinstance(label, frozenset) and (driver_name, constructor_name) in label), set())
+            if reverted:
+                whatif_journal.revert(frozenset(reverted))
+        for pair in reverted:
+            whatif_rows.pop(pair, None)
+    release_pairs(reverted)
+    return reverted
 
 
 if __name__ == "__main__":
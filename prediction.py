@@ -1,7 +1,9 @@
 from entities import load_f1_graph, Driver, Constructor, F1Graph
+from journal import Delta, Journal
 
 
-def simulate_whatif_for_nodes(f1_graph: F1Graph, driver_name: str, constructor_name: str):
+def simulate_whatif_for_nodes(f1_graph: F1Graph, driver_name: str, constructor_name: str,
+                              journal: Journal | None = None):
     """
     Given a driver name and a constructor name, simulate the what‑if scenario:
       - cmpute whatif_rating as the average of the driver's final elo and the constructor's elo.
@@ -9,26 +11,145 @@ def simulate_whatif_for_nodes(f1_graph: F1Graph, driver_name: str, constructor_n
       - add an edge to the graph.
       - recalculate and return the driver's new overall final elo.
 
+    If journal is given, the change is recorded in it under (driver_name, constructor_name)
+    so it can be reverted later.
+    Raise ValueError if either name is not in f1_graph or the driver is already adjacent to
+    the constructor; in that case f1_graph is left unchanged.
+
     Preconditions:
       - f1_graph must be a valid F1Graph instance with a non-empty database.
-      - driver_name must be a non-empty string corresponding to an existing driver in f1_graph.
-      - constructor_name must be a non-empty string
+      - journal is None or journal.f1_graph is f1_graph
     """
+    prev_final_elo, whatif_rating, delta = prepare_whatif(f1_graph, driver_name, constructor_name)
+    apply_whatif(f1_graph, journal, (driver_name, constructor_name), delta)
+
+    new_final_elo = f1_graph.drivers[driver_name].final_elo
+    return prev_final_elo, whatif_rating, new_final_elo
 
-    all_drivers = {}
-    for constr in f1_graph.database:
-        for drv in constr.all_driver_elo.keys():
-            all_drivers[drv.driver_name] = drv
-    all_constructors = {constr.constructor_name: constr for constr in f1_graph.database}
 
-    driver = all_drivers.get(driver_name)
-    constructor = all_constructors.get(constructor_name)
+def prepare_whatif(f1_graph: F1Graph, driver_name: str, constructor_name: str) -> tuple[float, int, Delta]:
+    """
+    Compute the what-if rating of driver_name at constructor_name without changing f1_graph.
+    Return (prev_final_elo, whatif_rating, delta), where delta is ready to be passed to
+    apply_whatif. Raise ValueError as for simulate_whatif_for_nodes.
+    """
+    driver, constructor = _resolve_move(f1_graph, _constructors_by_name(f1_graph), driver_name, constructor_name)
 
     prev_final_elo = driver.final_elo
     whatif_rating = int((driver.final_elo + constructor.constructor_elo) / 2)
 
-    driver.constructor_to_elo[constructor_name] = whatif_rating
-    f1_graph.add_edge(driver, constructor)
+    delta = Delta()
+    delta.rate_driver(driver, constructor_name, whatif_rating)
+    delta.add_edge(driver, constructor)
+    return prev_final_elo, whatif_rating, delta
 
-    new_final_elo = driver.calculate_final_elo()
-    return prev_final_elo, whatif_rating, new_final_elo
+
+class Scenario:
+    """
+    A batch of hypothetical driver-constructor moves (e.g. a whole driver-market reshuffle)
+    that are resolved together in a single pass.
+
+    Every what-if rating is computed from the graph as it stands before any move is applied,
+    so the outcome does not depend on the order the moves were added in. Unlike
+    simulate_whatif_for_nodes, resolving a scenario also feeds the what-if ratings into each
+    affected constructor's ELO.
+
+    Instance Attributes:
+        - moves (set): (driver_name, constructor_name) pairs to simulate
+
+    Representation Invariants:
+        - all(driver_name != '' and constructor_name != '' for driver_name, constructor_name in self.moves)
+    """
+    moves: set[tuple[str, str]]
+
+    def __init__(self, moves: list[tuple[str, str]] | None = None) -> None:
+        """Initialize a new Scenario containing the given moves."""
+        self.moves = set(moves) if moves else set()
+
+    def add_move(self, driver_name: str, constructor_name: str) -> None:
+        """Add a hypothetical move of driver_name to constructor_name to this scenario."""
+        self.moves.add((driver_name, constructor_name))
+
+    def remove_move(self, driver_name: str, constructor_name: str) -> None:
+        """Remove the given move from this scenario, if present."""
+        self.moves.discard((driver_name, constructor_name))
+
+    def resolve(self, f1_graph: F1Graph,
+                journal: Journal | None = None) -> dict[tuple[str, str], tuple[float, int, float]]:
+        """
+        Apply every move in this scenario to f1_graph in one batched pass and return a mapping
+        from each move to (prev_final_elo, whatif_rating, new_final_elo), as for
+        simulate_whatif_for_nodes.
+
+        Each affected driver and constructor has its ELO recalculated exactly once. If journal
+        is given, the whole scenario is recorded in it as a single delta labelled by this
+        scenario's moves, so it can be undone in one step.
+        Raise ValueError if a move names a driver or constructor not in f1_graph, or pairs a
+        driver with a constructor they are already adjacent to; in that case f1_graph is left
+        unchanged.
+        """
+        ratings, delta = self.prepare(f1_graph)
+        apply_whatif(f1_graph, journal, frozenset(self.moves), delta)
+
+        return {move: (prev_final_elo, whatif_rating, f1_graph.drivers[move[0]].final_elo)
+                for move, (prev_final_elo, whatif_rating) in ratings.items()}
+
+    def prepare(self, f1_graph: F1Graph) -> tuple[dict[tuple[str, str], tuple[float, int]], Delta]:
+        """
+        Rate every move in this scenario without changing f1_graph. Return a mapping from each
+        move to (prev_final_elo, whatif_rating), and the single delta that applies them all,
+        ready to be passed to apply_whatif. Raise ValueError as for resolve.
+        """
+        constructors = _constructors_by_name(f1_graph)
+        resolved = [_resolve_move(f1_graph, constructors, driver_name, constructor_name)
+                    for driver_name, constructor_name in sorted(self.moves)]
+
+        # Rate every move against the untouched graph so the order of moves does not matter
+        ratings = {(driver.driver_name, constructor.constructor_name):
+                   (driver.final_elo, int((driver.final_elo + constructor.constructor_elo) / 2))
+                   for driver, constructor in resolved}
+
+        delta = Delta()
+        for driver, constructor in resolved:
+            _, whatif_rating = ratings[(driver.driver_name, constructor.constructor_name)]
+            delta.rate_driver(driver, constructor.constructor_name, whatif_rating)
+            delta.rate_constructor(constructor, driver, whatif_rating)
+            delta.add_edge(driver, constructor)
+        return ratings, delta
+
+
+def apply_whatif(f1_graph: F1Graph, journal: Journal | None, label, delta: Delta) -> None:
+    """
+    Apply a delta built by prepare_whatif or Scenario.prepare to f1_graph, recording it in
+    journal under label if a journal is given.
+
+    Raise ValueError if a pair the delta rates has become adjacent since it was prepared
+    (e.g. by another simulation of the same pair); in that case f1_graph is left unchanged.
+    """
+    for driver, constructor_name, _, _ in delta.driver_ratings:
+        if constructor_name in driver.constructor_to_elo:
+            raise ValueError(f"{driver.driver_name} is already adjacent to {constructor_name}")
+    if journal is None:
+        delta.apply(f1_graph)
+    else:
+        journal.apply(label, delta)
+
+
+def _resolve_move(f1_graph: F1Graph, constructors: dict[str, Constructor], driver_name: str,
+                  constructor_name: str) -> tuple[Driver, Constructor]:
+    """
+    Return the driver and constructor of a hypothetical move. Raise ValueError if either name
+    is not in f1_graph or the driver is already adjacent to the constructor.
+    """
+    if driver_name not in f1_graph.drivers:
+        raise ValueError(f"Unknown driver: {driver_name}")
+    if constructor_name not in constructors:
+        raise ValueError(f"Unknown constructor: {constructor_name}")
+    driver, constructor = f1_graph.drivers[driver_name], constructors[constructor_name]
+    if (driver, constructor) in f1_graph.edges or constructor_name in driver.constructor_to_elo:
+        raise ValueError(f"{driver_name} is already adjacent to {constructor_name}")
+    return driver, constructor
+
+def _constructors_by_name(f1_graph: F1Graph) -> dict[str, Constructor]:
+    """Return a mapping from constructor names to the Constructor objects in f1_graph."""
+    return {constr.constructor_name: constr for constr in f1_graph.database}
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterator
+
+from journal import Delta, Journal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    scenario_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    base_version TEXT NOT NULL,
+    created REAL NOT NULL,
+    num_edges INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenarios_by_base ON scenarios (base_version, created);
+CREATE TABLE IF NOT EXISTS scenario_edges (
+    scenario_id TEXT NOT NULL,
+    driver_name TEXT NOT NULL,
+    constructor_name TEXT NOT NULL,
+    rating NUMERIC NOT NULL,
+    PRIMARY KEY (scenario_id, driver_name, constructor_name)
+);
+"""
+
+
+def graph_version(file_path: str, rounding: str) -> str:
+    """
+    Return a short fingerprint of a base graph loaded from the CSV file at file_path with the
+    given rounding mode, since both determine the ratings scenarios are built on.
+    """
+    digest = hashlib.sha1(rounding.encode())
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class CorruptScenarioError(Exception):
+    """Raised when a stored scenario's payload cannot be decoded or names an unknown driver or constructor."""
+
+
+class ScenarioStore:
+    """
+    A local SQLite store of hypothetical scenarios, saved as the journal of deltas applied
+    on top of a versioned base graph.
+
+    Only the new values of each delta are stored, with names interned in a string table and
+    the result compressed. Loading a scenario replays those deltas through a Journal rather
+    than rebuilding the graph from the CSV. Each scenario's hypothetical edges are also kept
+    in an indexed table so that listing and diffing never needs to decode a payload.
+
+    Scenario ids are derived from the base version and the payload, so saving the same
+    scenario twice yields the same id.
+
+    Instance Attributes:
+        - db_path (str): path to the SQLite database file
+        - base_version (str): version of the base graph scenarios are stored against
+
+    Representation Invariants:
+        - self.base_version != ''
+    """
+    db_path: str
+    base_version: str
+
+    def __init__(self, db_path: str, base_version: str) -> None:
+        """Initialize a ScenarioStore at db_path, creating its tables if needed."""
+        self.db_path = db_path
+        self.base_version = base_version
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def save(self, journal: Journal, name: str = '') -> str:
+        """Save the deltas currently applied in journal as a scenario and return its id."""
+        payload = _encode(journal.applied)
+        scenario_id = hashlib.sha1(self.base_version.encode() + payload).hexdigest()[:12]
+        edges = {(driver.driver_name, constructor_name): rating
+                 for _, delta in journal.applied
+                 for driver, constructor_name, _, rating in delta.driver_ratings}
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenario_edges WHERE scenario_id = ?", (scenario_id,))
+            conn.execute("INSERT OR REPLACE INTO scenarios VALUES (?, ?, ?, ?, ?, ?)",
+                         (scenario_id, name, self.base_version, time.time(), len(edges), payload))
+            conn.executemany("INSERT INTO scenario_edges VALUES (?, ?, ?, ?)",
+                             [(scenario_id, driver_name, constructor_name, rating)
+                              for (driver_name, constructor_name), rating in edges.items()])
+        return scenario_id
+
+    def load(self, scenario_id: str, journal: Journal) -> list[tuple[str, str, float, float, float]]:
+        """
+        Revert everything in journal, then replay the saved scenario's deltas onto its graph.
+        Return a (driver_name, constructor_name, prev_final_elo, whatif_rating, new_final_elo)
+        row for every driver rating the scenario sets, in the order they were applied.
+
+        Raise KeyError if there is no scenario with the given id, ValueError if it was saved
+        against a different base graph version, and CorruptScenarioError if its payload cannot
+        be replayed. In all of these cases journal and its graph are left unchanged.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT base_version, payload FROM scenarios WHERE scenario_id = ?",
+                               (scenario_id,)).fetchone()
+        if row is None:
+            raise KeyError(scenario_id)
+        base_version, payload = row
+        if base_version != self.base_version:
+            raise ValueError(f"Scenario {scenario_id} was saved against base graph {base_version}, "
+                             f"not {self.base_version}.")
+
+        # Build every delta before touching the journal, so a bad payload cannot leave half a scenario
+        f1_graph = journal.f1_graph
+        constructors = {constr.constructor_name: constr for constr in f1_graph.database}
+        deltas = []
+        labels = set()
+        try:
+            for label, driver_ratings, constructor_ratings, edges in _decode(payload):
+                if label in labels:
+                    raise ValueError(f"duplicate label {label!r}")
+                labels.add(label)
+                delta = Delta()
+                for driver_name, constructor_name, rating in driver_ratings:
+                    if constructor_name not in constructors:
+                        raise KeyError(constructor_name)
+                    delta.rate_driver(f1_graph.drivers[driver_name], constructor_name, rating)
+                for constructor_name, driver_name, rating in constructor_ratings:
+                    delta.rate_constructor(constructors[constructor_name], f1_graph.drivers[driver_name], rating)
+                for driver_name, constructor_name in edges:
+                    delta.add_edge(f1_graph.drivers[driver_name], constructors[constructor_name])
+                deltas.append((label, delta))
+        except (KeyError, IndexError, TypeError, ValueError, zlib.error) as error:
+            raise CorruptScenarioError(f"Scenario {scenario_id} cannot be replayed: {error!r}") from error
+
+        journal.clear()
+        results = []
+        for label, delta in deltas:
+            prev_final_elos = {driver: driver.final_elo for driver, _, _, _ in delta.driver_ratings}
+            journal.apply(label, delta)
+            results.extend((driver.driver_name, constructor_name, prev_final_elos[driver], rating, driver.final_elo)
+                           for driver, constructor_name, _, rating in delta.driver_ratings)
+        return results
+
+    def list_scenarios(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+        """
+        Return metadata for scenarios saved against this store's base version, newest first,
+        as dicts with keys 'scenario_id', 'name', 'created' and 'num_edges'.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT scenario_id, name, created, num_edges FROM scenarios "
+                                "WHERE base_version = ? ORDER BY created DESC LIMIT ? OFFSET ?",
+                                (self.base_version, limit, offset)).fetchall()
+        return [{'scenario_id': scenario_id, 'name': name, 'created': created, 'num_edges': num_edges}
+                for scenario_id, name, created, num_edges in rows]
+
+    def diff(self, scenario_a: str, scenario_b: str) -> dict[str, list[tuple]]:
+        """
+        Compare the hypothetical edges of two saved scenarios. Return a dict with keys:
+          - 'added': (driver_name, constructor_name, rating) edges only in scenario_b
+          - 'removed': (driver_name, constructor_name, rating) edges only in scenario_a
+          - 'changed': (driver_name, constructor_name, rating_a, rating_b) edges in both
+            whose what-if rating differs
+        """
+        only_in = ("SELECT a.driver_name, a.constructor_name, a.rating FROM scenario_edges a "
+                   "WHERE a.scenario_id = ? AND NOT EXISTS (SELECT 1 FROM scenario_edges b "
+                   "WHERE b.scenario_id = ? AND b.driver_name = a.driver_name "
+                   "AND b.constructor_name = a.constructor_name) "
+                   "ORDER BY a.driver_name, a.constructor_name")
+        changed = ("SELECT a.driver_name, a.constructor_name, a.rating, b.rating FROM scenario_edges a "
+                   "JOIN scenario_edges b ON a.driver_name = b.driver_name "
+                   "AND a.constructor_name = b.constructor_name "
+                   "WHERE a.scenario_id = ? AND b.scenario_id = ? AND a.rating != b.rating "
+                   "ORDER BY a.driver_name, a.constructor_name")
+        with self._connect() as conn:
+            return {
+                'added': conn.execute(only_in, (scenario_b, scenario_a)).fetchall(),
+                'removed': conn.execute(only_in, (scenario_a, scenario_b)).fetchall(),
+                'changed': conn.execute(changed, (scenario_a, scenario_b)).fetchall()
+            }
+
+    def delete(self, scenario_id: str) -> None:
+        """Delete the scenario with the given id, if it exists."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenario_edges WHERE scenario_id = ?", (scenario_id,))
+            conn.execute("DELETE FROM scenarios WHERE scenario_id = ?", (scenario_id,))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection to the store's database, commit (or roll back) when the block
+        exits, and close it. A connection per call keeps the store safe to use from
+        several Dash worker threads.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _encode(applied: list[tuple[Hashable, Delta]]) -> bytes:
+    """
+    Encode the new values of the given journal entries compactly. Names are replaced by
+    indices into a shared string table, and the JSON result is zlib-compressed.
+    """
+    names = {}
+
+    def ref(name: str) -> int:
+        return names.setdefault(name, len(names))
+
+    entries = []
+    for label, delta in applied:
+        entries.append([
+            _encode_label(label, ref),
+            [[ref(driver.driver_name), ref(constructor_name), rating]
+             for driver, constructor_name, _, rating in delta.driver_ratings],
+            [[ref(constructor.constructor_name), ref(driver.driver_name), rating]
+             for constructor, driver, _, rating in delta.constructor_ratings],
+            [[ref(driver.driver_name), ref(constructor.constructor_name)] for driver, constructor in delta.new_edges]
+        ])
+    document = {'names': list(names), 'deltas': entries}
+    return zlib.compress(json.dumps(document, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def _decode(payload: bytes) -> list[tuple[Hashable, list, list, list]]:
+    """Decode a payload produced by _encode into (label, driver_ratings, constructor_ratings, edges) entries."""
+    document = json.loads(zlib.decompress(payload).decode('utf-8'))
+    names = document['names']
+    for _, driver_ratings, constructor_ratings, _ in document['deltas']:
+        for *_, rating in driver_ratings + constructor_ratings:
+            if isinstance(rating, bool) or not isinstance(rating, (int, float)):
+                raise TypeError(f"rating {rating!r} is not a number")
+
+    def name(index: int) -> str:
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < len(names):
+            raise IndexError(f"name index {index!r} is out of range")
+        return names[index]
+
+    return [(_decode_label(label, name),
+             [(name(d), name(c), rating) for d, c, rating in driver_ratings],
+             [(name(c), name(d), rating) for c, d, rating in constructor_ratings],
+             [(name(d), name(c)) for d, c in edges])
+            for label, driver_ratings, constructor_ratings, edges in document['deltas']]
+
+
+def _encode_label(label: Hashable, ref) -> list:
+    """
+    Encode a journal label: either a (driver_name, constructor_name) pair, as recorded by
+    simulate_whatif_for_nodes, or a frozenset of such pairs, as recorded by Scenario.resolve.
+    Raise ValueError for any other label.
+    """
+    if isinstance(label, tuple) and len(label) == 2:
+        return [ref(label[0]), ref(label[1])]
+    if isinstance(label, frozenset):
+        return [[ref(d), ref(c)] for d, c in sorted(label)]
+    raise ValueError(f"Cannot store journal label {label!r}.")
+
+
+def _decode_label(label: list, name) -> Hashable:
+    """Decode a label produced by _encode_label, looking up each name index with name."""
+    if len(label) == 2 and all(isinstance(i, int) for i in label):
+        return name(label[0]), name(label[1])
+    return frozenset((name(d), name(c)) for d, c in label)
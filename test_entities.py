@@ -0,0 +1,105 @@
+from entities import Constructor, Driver, Leaderboard, load_f1_graph
+
+FILE_PATH = 'preprocessing/data/final_data.csv'
+
+
+def test_ingestion_keeps_rankings_current() -> None:
+    """Ratings ingested through calculate_driver_elo are reflected in every leaderboard."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    driver = f1_graph.drivers['Nico Rosberg']
+    for _ in range(20):
+        driver.calculate_driver_elo(f1_graph, 26, 25, 1, 'Mercedes', year=2013)
+
+    for era in (None, 'V8', 'Turbo-hybrid'):
+        assert f1_graph.driver_ranks[era].rating_of('Nico Rosberg') == driver.final_elo
+        assert f1_graph.driver_ranks[era].rank_of('Nico Rosberg') == 1
+    mercedes = next(constr for constr in f1_graph.database if constr.constructor_name == 'Mercedes')
+    assert f1_graph.constructor_ranks[None].rating_of('Mercedes') == mercedes.constructor_elo
+
+
+def test_leaderboard_ties_share_rank() -> None:
+    """Tied ratings share the best rank and count as half in each other's percentile."""
+    board = Leaderboard()
+    for name, rating in [('a', 10), ('b', 20), ('c', 20), ('d', 5)]:
+        board.update(name, rating)
+
+    assert [board.rank_of(name) for name in 'bcad'] == [1, 1, 3, 4]
+    assert board.percentile('b') == board.percentile('c') == 100 * (2 + 2 / 2) / 4
+    assert board.percentile('d') == 100 * (1 / 2) / 4
+    assert board.top(3) == [('b', 20), ('c', 20), ('a', 10)]
+    assert board.top(10) == board.top(4)
+    assert board.top(0) == []
+
+
+def test_leaderboard_update_and_remove_move_entries() -> None:
+    """Updating a rating moves its entry, and removing it re-ranks the rest."""
+    board = Leaderboard()
+    for name, rating in [('a', 10), ('b', 20), ('c', 30)]:
+        board.update(name, rating)
+
+    board.update('a', 40)
+    assert board.top(3) == [('a', 40), ('c', 30), ('b', 20)]
+    assert board.rank_of('b') == 3 and len(board) == 3
+
+    board.remove('c')
+    board.remove('missing')
+    assert 'c' not in board
+    assert board.rank_of('b') == 2
+    assert board.top(3) == [('a', 40), ('b', 20)]
+    assert board.rating_of('a') == 40
+
+
+def test_era_leaderboards_filter_membership_only() -> None:
+    """Era leaderboards hold only drivers who raced in the era, ranked by their career ELO."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    schumacher = f1_graph.drivers['Michael Schumacher']
+
+    assert 'Michael Schumacher' in f1_graph.driver_ranks['V8']
+    assert 'Michael Schumacher' not in f1_graph.driver_ranks['Turbo-hybrid']
+    assert f1_graph.driver_ranks['V8'].rating_of('Michael Schumacher') == schumacher.final_elo
+
+
+def test_compat_rounding_reproduces_original_ratings() -> None:
+    """'compat' mode gives the ratings of earlier versions; 'exact' mode keeps half points until read."""
+    compat = load_f1_graph(FILE_PATH, rounding='compat')
+    exact = load_f1_graph(FILE_PATH, rounding='exact')
+
+    for f1_graph, expected in [(compat, {'Lewis Hamilton': (1671, {'McLaren': 663, 'Mercedes': 2678}),
+                                         'Fernando Alonso': (584, {'Ferrari': 1043, 'McLaren': 125})}),
+                               (exact, {'Lewis Hamilton': (1620, {'McLaren': 640, 'Mercedes': 2599}),
+                                        'Fernando Alonso': (550, {'Ferrari': 1000, 'McLaren': 100})})]:
+        for name, (final_elo, constructor_to_elo) in expected.items():
+            assert f1_graph.drivers[name].final_elo == final_elo
+            assert f1_graph.drivers[name].constructor_to_elo == constructor_to_elo
+
+    for f1_graph, expected in [(compat, {'Force India': 175, 'Mercedes': 1103, 'Ferrari': 811}),
+                               (exact, {'Force India': 150, 'Mercedes': 1059, 'Ferrari': 773})]:
+        assert {constr.constructor_name: constr.constructor_elo
+                for constr in f1_graph.database if constr.constructor_name in expected} == expected
+
+
+def test_unit_sums_stay_consistent_after_removals() -> None:
+    """add_elo_units and set_elo_units keep the running unit sums equal to the stored units."""
+    driver = Driver('Driver')
+    constructor = Constructor('Constructor')
+    other = Driver('Other')
+
+    driver.add_elo_units('A', 30)
+    driver.add_elo_units('A', 11)
+    driver.set_elo_units('B', 100)
+    driver.set_elo_units('A', None)
+    driver.set_elo_units('missing', None)
+    driver.add_elo_units('C', 1)
+    assert driver._units_sum == sum(driver._elo_units.values()) == 101
+    assert driver.constructor_to_elo == {'B': 5, 'C': 1}
+    assert driver.final_elo == 3  # ceil(101 / (2 * ELO_SCALE))
+
+    constructor.set_elo_units(driver, 41)
+    constructor.set_elo_units(other, 20)
+    constructor.set_elo_units(driver, None)
+    assert constructor._units_sum == sum(constructor._elo_units.values()) == 20
+    assert constructor.constructor_elo == 1
+
+    driver.set_elo_units('B', None)
+    driver.set_elo_units('C', None)
+    assert driver._units_sum == 0 and driver.final_elo == 0.0
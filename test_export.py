@@ -0,0 +1,101 @@
+import json
+import math
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from entities import load_f1_graph
+from export import export_scenario, write_arrow, write_graphml, write_ndjson, write_parquet
+from journal import Journal
+from prediction import simulate_whatif_for_nodes
+from scenario_store import ScenarioStore, graph_version
+
+FILE_PATH = 'preprocessing/data/final_data.csv'
+GRAPHML = '{http://graphml.graphdrawing.org/xmlns}'
+
+
+def simulated_graph():
+    """Return a graph with Lewis Hamilton at Williams applied through a journal, and the journal."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    journal = Journal(f1_graph)
+    simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams', journal)
+    return f1_graph, journal
+
+
+def expected_counts(f1_graph) -> dict[str, int]:
+    """Return the number of records each export table should hold for f1_graph."""
+    return {'nodes': len(f1_graph.drivers) + len(f1_graph.database),
+            'edges': len(f1_graph.edges),
+            'constructor_elos': sum(len(constr.all_driver_elo) for constr in f1_graph.database)}
+
+
+def test_ndjson_round_trip(tmp_path) -> None:
+    """Every node, edge and constructor ELO is written once, with the applied edge marked hypothetical."""
+    f1_graph, journal = simulated_graph()
+    path = str(tmp_path / 'graph.ndjson')
+    write_ndjson(f1_graph, path, journal)
+
+    with open(path, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    counts = expected_counts(f1_graph)
+    for record_type, table in [('node', 'nodes'), ('edge', 'edges'), ('constructor_elo', 'constructor_elos')]:
+        assert sum(record['type'] == record_type for record in records) == counts[table]
+    assert [(record['source'], record['target']) for record in records if record.get('hypothetical')] == \
+        [('driver-Lewis Hamilton', 'constructor-Williams')]
+
+
+def test_graphml_round_trip(tmp_path) -> None:
+    """The GraphML output parses and holds every node and edge, one of them hypothetical."""
+    f1_graph, journal = simulated_graph()
+    path = str(tmp_path / 'graph.graphml')
+    write_graphml(f1_graph, path, journal)
+
+    graph = ET.parse(path).getroot().find(f'{GRAPHML}graph')
+    edges = graph.findall(f'{GRAPHML}edge')
+    assert len(graph.findall(f'{GRAPHML}node')) == expected_counts(f1_graph)['nodes']
+    assert len(edges) == len(f1_graph.edges)
+    hypothetical = [edge for edge in edges
+                    if edge.find(f"{GRAPHML}data[@key='hypothetical']").text == 'true']
+    assert [edge.get('source') for edge in hypothetical] == ['driver-Lewis Hamilton']
+
+
+def test_parquet_and_arrow_round_trip(tmp_path) -> None:
+    """Parquet and Arrow tables read back with every row, in chunk_size batches."""
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    f1_graph, journal = simulated_graph()
+    write_parquet(f1_graph, str(tmp_path), journal, chunk_size=7)
+    write_arrow(f1_graph, str(tmp_path), journal, chunk_size=7)
+
+    for name, count in expected_counts(f1_graph).items():
+        parquet = pq.ParquetFile(str(tmp_path / f'{name}.parquet'))
+        assert parquet.metadata.num_rows == count
+        assert parquet.metadata.num_row_groups == math.ceil(count / 7)
+        with pa.memory_map(str(tmp_path / f'{name}.arrow')) as source:
+            reader = pa.ipc.open_file(source)
+            assert reader.num_record_batches == math.ceil(count / 7)
+            assert reader.read_all().num_rows == count
+
+    edges = pq.read_table(str(tmp_path / 'edges.parquet')).to_pylist()
+    assert [edge['source'] for edge in edges if edge['hypothetical']] == ['driver-Lewis Hamilton']
+
+
+def test_export_saved_scenario(tmp_path) -> None:
+    """A saved scenario exports from a fresh copy of the base graph."""
+    f1_graph, journal = simulated_graph()
+    db_path = str(tmp_path / 'scenarios.db')
+    scenario_id = ScenarioStore(db_path, graph_version(FILE_PATH, f1_graph.rounding)).save(journal)
+    journal.clear()
+
+    export_scenario(FILE_PATH, db_path, scenario_id, str(tmp_path / 'out'), formats=('ndjson',))
+    assert os.listdir(tmp_path / 'out') == ['graph.ndjson']
+    with open(tmp_path / 'out' / 'graph.ndjson', encoding='utf-8') as file:
+        hypothetical = [json.loads(line) for line in file if '"hypothetical":true' in line]
+    assert [(edge['source'], edge['target']) for edge in hypothetical] == \
+        [('driver-Lewis Hamilton', 'constructor-Williams')]
+
+    with pytest.raises(ValueError):
+        export_scenario(FILE_PATH, db_path, scenario_id, str(tmp_path / 'out'), formats=('csv',))
+    with pytest.raises(KeyError):
+        export_scenario(FILE_PATH, db_path, 'missing', str(tmp_path / 'out'))
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from jobs import JobQueue
+
+
+def test_submit_deduplicates_in_flight_jobs_by_key() -> None:
+    """A job submitted under the key of a job still in flight shares that job's id."""
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    first = queue.submit('key', release.wait)
+    assert queue.submit('key', release.wait) == first
+    other = queue.submit('other', lambda: 'other')
+    assert other != first
+    assert queue.in_flight() == 2
+
+    release.set()
+    queue.shutdown()
+    assert queue.status(first) == 'done'
+    assert queue.result(other) == 'other'
+    # Once finished, neither key blocks a new submission
+    assert queue.in_flight() == 0
+    assert queue._in_flight == {}
+
+
+def test_failed_job_reraises_from_result() -> None:
+    """A job that raises is reported as failed and result re-raises its exception."""
+    queue = JobQueue()
+
+    def fail() -> None:
+        raise ValueError('bad names')
+
+    job_id = queue.submit('fail', fail)
+    queue.shutdown()
+    assert queue.status(job_id) == 'failed'
+    with pytest.raises(ValueError, match='bad names'):
+        queue.result(job_id)
+
+
+def test_cancelled_job_status() -> None:
+    """A job cancelled before it ran is reported as cancelled rather than raising."""
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    queue.submit('blocker', release.wait)
+    job_id = queue.submit('queued', lambda: None)
+    assert queue.status(job_id) == 'pending'
+    assert queue._get(job_id).cancel()
+
+    assert queue.status(job_id) == 'cancelled'
+    release.set()
+    queue.shutdown()
+
+
+def test_finished_jobs_are_evicted() -> None:
+    """Only the max_finished most recently finished jobs can still be polled."""
+    queue = JobQueue(max_workers=1, max_finished=2)
+    job_ids = [queue.submit(i, lambda i=i: i) for i in range(4)]
+    queue.shutdown()
+
+    assert [queue.status(job_id) for job_id in job_ids] == ['unknown', 'unknown', 'done', 'done']
+    assert queue.result(job_ids[-1]) == 3
+    assert queue.status('job-999') == 'unknown'
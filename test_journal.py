@@ -0,0 +1,92 @@
+import pytest
+
+from entities import load_f1_graph
+from journal import Delta, Journal
+from prediction import simulate_whatif_for_nodes
+
+FILE_PATH = 'preprocessing/data/final_data.csv'
+
+
+def graph_state(f1_graph) -> tuple:
+    """Return a comparable snapshot of every exact rating and edge in f1_graph."""
+    drivers = {name: (dict(driver._elo_units), driver.final_elo) for name, driver in f1_graph.drivers.items()}
+    constructors = {constr.constructor_name: ({d.driver_name: u for d, u in constr._elo_units.items()},
+                                              constr.constructor_elo)
+                    for constr in f1_graph.database}
+    edges = {(d.driver_name, c.constructor_name) for d, c in f1_graph.edges}
+    return drivers, constructors, edges
+
+
+def overlapping_delta(f1_graph, rating: int) -> Delta:
+    """Return a delta rating Lewis Hamilton at Ferrari, on both the driver and constructor side."""
+    driver = f1_graph.drivers['Lewis Hamilton']
+    ferrari = next(constr for constr in f1_graph.database if constr.constructor_name == 'Ferrari')
+    delta = Delta()
+    delta.rate_driver(driver, 'Ferrari', rating)
+    delta.rate_constructor(ferrari, driver, rating)
+    delta.add_edge(driver, ferrari)
+    return delta
+
+
+def test_revert_overlapping_deltas_is_exact() -> None:
+    """Reverting a delta that a later delta overwrites leaves the later one exactly revertible."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    base = graph_state(f1_graph)
+    journal = Journal(f1_graph)
+
+    simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Ferrari', journal)
+    journal.apply('second', overlapping_delta(f1_graph, 500))
+    with_second_only = graph_state(f1_graph)
+
+    journal.revert(('Lewis Hamilton', 'Ferrari'))
+    assert graph_state(f1_graph) == with_second_only
+    journal.clear()
+    assert graph_state(f1_graph) == base
+
+
+def test_revert_then_undo_redo_is_exact() -> None:
+    """Undo, redo and snapshot/restore stay exact around an out-of-order revert."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    base = graph_state(f1_graph)
+    journal = Journal(f1_graph)
+
+    journal.apply('first', overlapping_delta(f1_graph, 300))
+    snapshot = journal.snapshot()
+    journal.apply('second', overlapping_delta(f1_graph, 500))
+    journal.apply('third', overlapping_delta(f1_graph, 700))
+    journal.revert('second')
+    journal.undo()
+    journal.redo()
+    journal.restore(snapshot)
+    journal.apply('fourth', overlapping_delta(f1_graph, 900))
+    journal.revert('first')
+    journal.clear()
+    assert graph_state(f1_graph) == base
+
+
+def test_apply_rejects_duplicate_label() -> None:
+    """Applying a second delta under a label already in the journal raises ValueError."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    journal = Journal(f1_graph)
+    journal.apply('label', overlapping_delta(f1_graph, 300))
+    with pytest.raises(ValueError):
+        journal.apply('label', overlapping_delta(f1_graph, 500))
+
+
+def test_adopted_edge_is_not_duplicated_by_undo_redo() -> None:
+    """An edge taken over from a reverted delta is recorded once, however often it is re-applied."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    base = graph_state(f1_graph)
+    journal = Journal(f1_graph)
+
+    journal.apply('first', overlapping_delta(f1_graph, 300))
+    second = overlapping_delta(f1_graph, 500)
+    journal.apply('second', second)
+    journal.revert('first')
+    journal.undo()
+    journal.redo()
+
+    assert len(second.new_edges) == 1
+    assert len(second) == 3
+    journal.clear()
+    assert graph_state(f1_graph) == base
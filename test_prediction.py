@@ -0,0 +1,62 @@
+import pytest
+
+from entities import load_f1_graph
+from prediction import Scenario, simulate_whatif_for_nodes
+
+FILE_PATH = 'preprocessing/data/final_data.csv'
+
+
+def test_resolve_rejects_existing_pairing() -> None:
+    """A scenario move naming a real pairing raises ValueError without changing the graph."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    leclerc = f1_graph.drivers['Charles Leclerc']
+    ferrari_elo = dict(leclerc.constructor_to_elo)
+
+    with pytest.raises(ValueError):
+        Scenario([('Lewis Hamilton', 'Williams'), ('Charles Leclerc', 'Ferrari')]).resolve(f1_graph)
+    assert leclerc.constructor_to_elo == ferrari_elo
+    assert f1_graph.drivers['Lewis Hamilton'].elo_units('Williams') is None
+
+
+def test_simulate_rejects_existing_pairing() -> None:
+    """simulate_whatif_for_nodes refuses to overwrite a real or already-simulated rating."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    leclerc = f1_graph.drivers['Charles Leclerc']
+    ratings = dict(leclerc.constructor_to_elo)
+
+    with pytest.raises(ValueError):
+        simulate_whatif_for_nodes(f1_graph, 'Charles Leclerc', 'Ferrari')
+    assert leclerc.constructor_to_elo == ratings
+
+    simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams')
+    hamilton = dict(f1_graph.drivers['Lewis Hamilton'].constructor_to_elo)
+    with pytest.raises(ValueError):
+        simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams')
+    assert f1_graph.drivers['Lewis Hamilton'].constructor_to_elo == hamilton
+
+
+def test_simulate_rejects_unknown_names() -> None:
+    """Unknown driver or constructor names raise ValueError."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    with pytest.raises(ValueError):
+        simulate_whatif_for_nodes(f1_graph, 'Nobody', 'Ferrari')
+    with pytest.raises(ValueError):
+        simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Nowhere')
+
+
+def test_resolve_is_order_independent() -> None:
+    """Resolving the same moves added in different orders gives identical results and graphs."""
+    moves = [('Lewis Hamilton', 'Williams'), ('Fernando Alonso', 'Williams'), ('Charles Leclerc', 'McLaren')]
+    outcomes = []
+    for order in (moves, moves[::-1]):
+        f1_graph = load_f1_graph(FILE_PATH)
+        scenario = Scenario()
+        for driver_name, constructor_name in order:
+            scenario.add_move(driver_name, constructor_name)
+        results = scenario.resolve(f1_graph)
+        drivers = {name: (driver.final_elo, dict(driver.constructor_to_elo))
+                   for name, driver in f1_graph.drivers.items()}
+        constructors = {constr.constructor_name: constr.constructor_elo for constr in f1_graph.database}
+        outcomes.append((results, drivers, constructors))
+
+    assert outcomes[0] == outcomes[1]
@@ -0,0 +1,80 @@
+import json
+import sqlite3
+import zlib
+
+import pytest
+
+from entities import load_f1_graph
+from journal import Journal
+from prediction import simulate_whatif_for_nodes
+from scenario_store import CorruptScenarioError, ScenarioStore
+
+FILE_PATH = 'preprocessing/data/final_data.csv'
+
+
+def test_corrupt_scenario_leaves_journal_unchanged(tmp_path) -> None:
+    """Loading a payload naming an unknown driver raises CorruptScenarioError and changes nothing."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    journal = Journal(f1_graph)
+    store = ScenarioStore(str(tmp_path / 'scenarios.db'), 'base')
+
+    simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams', journal)
+    scenario_id = store.save(journal)
+    simulate_whatif_for_nodes(f1_graph, 'Max Verstappen', 'Ferrari', journal)
+    labels = journal.labels()
+    final_elo = f1_graph.drivers['Max Verstappen'].final_elo
+
+    document = json.loads(zlib.decompress(_payload(store, scenario_id)))
+    document['names'] = ['Nobody' if name == 'Lewis Hamilton' else name for name in document['names']]
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("UPDATE scenarios SET payload = ? WHERE scenario_id = ?",
+                     (zlib.compress(json.dumps(document).encode()), scenario_id))
+
+    with pytest.raises(CorruptScenarioError):
+        store.load(scenario_id, journal)
+    assert journal.labels() == labels
+    assert f1_graph.drivers['Max Verstappen'].final_elo == final_elo
+
+    with pytest.raises(KeyError):
+        store.load('missing', journal)
+
+
+def test_load_replays_saved_scenario(tmp_path) -> None:
+    """A saved scenario loads back in place of the current hypothetical edges."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    journal = Journal(f1_graph)
+    store = ScenarioStore(str(tmp_path / 'scenarios.db'), 'base')
+
+    expected = simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams', journal)
+    scenario_id = store.save(journal)
+    journal.clear()
+    simulate_whatif_for_nodes(f1_graph, 'Max Verstappen', 'Ferrari', journal)
+
+    assert store.load(scenario_id, journal) == [('Lewis Hamilton', 'Williams', *expected)]
+    assert journal.labels() == [('Lewis Hamilton', 'Williams')]
+
+
+@pytest.mark.parametrize('index', [-1, 99, True])
+def test_out_of_range_name_index_is_corrupt(tmp_path, index) -> None:
+    """A name index outside the string table is rejected instead of resolving to another name."""
+    f1_graph = load_f1_graph(FILE_PATH)
+    journal = Journal(f1_graph)
+    store = ScenarioStore(str(tmp_path / 'scenarios.db'), 'base')
+
+    simulate_whatif_for_nodes(f1_graph, 'Lewis Hamilton', 'Williams', journal)
+    scenario_id = store.save(journal)
+    document = json.loads(zlib.decompress(_payload(store, scenario_id)))
+    document['deltas'][0][1][0][0] = index
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("UPDATE scenarios SET payload = ? WHERE scenario_id = ?",
+                     (zlib.compress(json.dumps(document).encode()), scenario_id))
+
+    with pytest.raises(CorruptScenarioError):
+        store.load(scenario_id, journal)
+    assert journal.labels() == [('Lewis Hamilton', 'Williams')]
+
+
+def _payload(store: ScenarioStore, scenario_id: str) -> bytes:
+    """Return the stored payload of the given scenario."""
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT payload FROM scenarios WHERE scenario_id = ?", (scenario_id,)).fetchone()[0]